@@ -0,0 +1,141 @@
+import numpy as np
+import bin.formats.vars as vars
+from bin.lib.FRC_CAN_Lib import id_codec
+
+# ------------------------------------------------------------
+# On-wire size of a CAN 2.0 frame, worst-case bit stuffing
+#   extended: SOF, 29 bit ID, SRR, IDE, RTR, r1, r0, DLC, data, CRC -> 54 + 8n stuffable bits
+#             + CRC delimiter, ACK, EOF, IFS                        -> 67 + 8n bits
+#   standard: 34 + 8n stuffable bits, 47 + 8n bits
+# ------------------------------------------------------------
+def get_frame_bits(dlcs, flags):
+    dlcs = np.asarray(dlcs, dtype=np.int64)
+    extended = id_codec.is_extended_flags(flags)
+    stuffable = np.where(extended, 54, 34) + 8 * dlcs
+    return np.where(extended, 67, 47) + 8 * dlcs + (stuffable - 1) // 4
+
+
+class Bus_Load_Analyzer:
+    def __init__(self, window_s: float = None, buckets: int = None, baudrate: int = None):
+        """
+        Sliding-window bus load and per-ID rates.
+
+        The window is a ring of time buckets; each frame adds its bits to one bucket, and
+        buckets are recycled as time moves on, so the cost per frame does not depend on
+        the window length or on how long the bus has been watched.
+        """
+        self.window_s = window_s or vars.busload_window_s
+        self.slots = buckets or vars.busload_buckets
+        self.bucket_ns = round(self.window_s * 1e9 / self.slots)
+        self.baudrate = baudrate or vars.can_baudrate
+        self.clear()
+
+    def clear(self):
+        self.head = None   # newest bucket number (ts_ns // bucket_ns)
+        self.first = None  # first bucket seen
+        self.bits = np.zeros(self.slots, dtype=np.int64)
+        self.frames = np.zeros(self.slots, dtype=np.int64)
+
+        self.rows = {}     # frameid -> row of the per-ID arrays
+        self.frameids = np.zeros(0, dtype=np.uint32)
+        self.id_bits = np.zeros((0, self.slots), dtype=np.int64)
+        self.id_frames = np.zeros((0, self.slots), dtype=np.int64)
+
+        self.total_frames = 0
+        self.total_bits = 0
+        self.peak_pct = 0.0
+
+    # ---------------- Feeding ----------------
+    def update(self, batch):
+        ts_ns, frameids, payloads, dlcs, flags = batch
+        if not len(frameids): return
+
+        bits = get_frame_bits(dlcs, flags)
+        rows = self.get_rows(frameids)
+        buckets = np.asarray(ts_ns) // self.bucket_ns
+        if np.any(buckets[1:] < buckets[:-1]):
+            order = np.argsort(buckets, kind="stable")
+            buckets, rows, bits = buckets[order], rows[order], bits[order]
+
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(buckets)]
+        for bucket, start, end in zip(buckets[starts].tolist(), starts.tolist(), ends.tolist()):
+            self.add_bucket(bucket, rows[start:end], bits[start:end])
+
+        self.total_frames += len(bits)
+        self.total_bits += int(bits.sum())
+
+    def get_rows(self, frameids):
+        ids, inverse = np.unique(frameids, return_inverse=True)
+        id_rows = np.empty(len(ids), dtype=np.int64)
+        new = []
+        for i, frameid in enumerate(ids.tolist()):
+            row = self.rows.get(frameid)
+            if row is None:
+                row = self.rows[frameid] = len(self.frameids) + len(new)
+                new.append(frameid)
+            id_rows[i] = row
+
+        if new:
+            self.frameids = np.r_[self.frameids, np.array(new, dtype=np.uint32)]
+            pad = np.zeros((len(new), self.slots), dtype=np.int64)
+            self.id_bits, self.id_frames = np.vstack([self.id_bits, pad]), np.vstack([self.id_frames, pad])
+        return id_rows[inverse.ravel()]
+
+    def add_bucket(self, bucket, rows, bits):
+        if self.head is None: self.head = self.first = bucket
+        if bucket > self.head: self.advance(bucket)
+
+        # Frames older than the window (out of order) are counted in its oldest bucket
+        slot = max(bucket, self.head - self.slots + 1) % self.slots
+        n = len(self.frameids)
+        self.bits[slot] += int(bits.sum())
+        self.frames[slot] += len(bits)
+        self.id_bits[:, slot] += np.bincount(rows, weights=bits, minlength=n).astype(np.int64)
+        self.id_frames[:, slot] += np.bincount(rows, minlength=n)
+
+    def advance(self, bucket):
+        # The window ending at the old head is complete: check it for the peak, then recycle buckets
+        if self.head - self.first + 1 >= self.slots:
+            self.peak_pct = max(self.peak_pct, self.get_utilization())
+        for b in range(self.head + 1, min(bucket, self.head + self.slots) + 1):
+            slot = b % self.slots
+            self.bits[slot] = self.frames[slot] = 0
+            self.id_bits[:, slot] = self.id_frames[:, slot] = 0
+        self.head = bucket
+
+    # ---------------- Results ----------------
+    def get_window_s(self):
+        # Shorter than the window until the window has filled once
+        if self.head is None: return self.window_s
+        return min(self.slots, self.head - self.first + 1) * self.bucket_ns / 1e9
+
+    def get_utilization(self):
+        return 100.0 * int(self.bits.sum()) / (self.baudrate * self.get_window_s())
+
+    def get_peak(self): return max(self.peak_pct, self.get_utilization())
+
+    def get_average(self):
+        if self.head is None: return 0.0
+        return 100.0 * self.total_bits / (self.baudrate * (self.head - self.first + 1) * self.bucket_ns / 1e9)
+
+    def get_fps(self): return int(self.frames.sum()) / self.get_window_s()
+
+    def get_id_rates(self):
+        # {frameid: frames/s over the window}
+        return dict(zip(self.frameids.tolist(), (self.id_frames.sum(axis=1) / self.get_window_s()).tolist()))
+
+    def get_top_talkers(self, n: int = None):
+        # [(frameid, frames/s, % of the bus)] of the IDs using the most bits in the window
+        n = n or vars.busload_top_n
+        id_bits = self.id_bits.sum(axis=1)
+        window_s = self.get_window_s()
+        top = np.argsort(id_bits, kind="stable")[::-1][:n]
+        return [(int(self.frameids[row]), round(int(self.id_frames[row].sum()) / window_s, 1),
+                 round(100.0 * int(id_bits[row]) / (self.baudrate * window_s), 2)) for row in top if id_bits[row]]
+
+    def report(self):
+        return {"window_s": round(self.get_window_s(), 3), "utilization_pct": round(self.get_utilization(), 2),
+                "peak_pct": round(self.get_peak(), 2), "average_pct": round(self.get_average(), 2),
+                "fps": round(self.get_fps(), 1), "frames": self.total_frames, "ids": len(self.frameids),
+                "top_talkers": [{"id": hex(frameid), "fps": fps, "load_pct": pct} for frameid, fps, pct in self.get_top_talkers()]}
@@ -0,0 +1,148 @@
+import numpy as np
+import bin.formats.vars as vars
+
+class Frame_Ring_Buffer:
+    def __init__(self, capacity: int | None = None, seconds: float | None = None):
+        """
+        Fixed-size store for live frames, sized in frames or in seconds of a full bus.
+
+        Every frame is written twice (slot and slot + capacity), so the most recent
+        window is always one contiguous slice and can be handed out as a view.
+        """
+        if capacity is None:
+            capacity = round((seconds or vars.live_buffer_seconds) * vars.can_max_frame_rate)
+        self.capacity = capacity
+
+        self.ts_ns = np.zeros(2 * capacity, dtype=np.int64)
+        self.frameids = np.zeros(2 * capacity, dtype=np.uint32)
+        self.payloads = np.zeros((2 * capacity, 8), dtype=np.uint8)
+        self.dlcs = np.zeros(2 * capacity, dtype=np.uint8)
+        self.flags = np.zeros(2 * capacity, dtype=np.uint8)
+
+        self.head = 0   # next slot to write, in [0, capacity)
+        self.total = 0  # frames written since the last clear
+
+    def __len__(self): return min(self.total, self.capacity)
+
+    def clear(self):
+        self.head = 0
+        self.total = 0
+
+    def extend(self, batch):
+        n = len(batch[0])
+        skip = max(n - self.capacity, 0)  # a batch bigger than the buffer only keeps its newest frames
+        cap, head = self.capacity, self.head
+
+        for column, values in zip((self.ts_ns, self.frameids, self.payloads, self.dlcs, self.flags), batch):
+            values = values[skip:]
+            first = min(len(values), cap - head)
+            column[head:head + first] = column[head + cap:head + cap + first] = values[:first]
+            rest = len(values) - first
+            column[:rest] = column[cap:cap + rest] = values[first:]
+
+        self.head = (head + n - skip) % cap
+        self.total += n
+
+    def latest(self, n: int | None = None):
+        """
+        Zero-copy views of the newest n frames (all buffered frames by default), oldest first.
+        """
+        n = len(self) if n is None else min(n, len(self))
+        start = (self.head - n) % self.capacity
+        window = slice(start, start + n)
+        return [self.ts_ns[window], self.frameids[window], self.payloads[window], self.dlcs[window], self.flags[window]]
+
+    def window(self, seconds: float):
+        # Frames within `seconds` of the newest one
+        batch = self.latest()
+        if not len(batch[0]): return batch
+        start = int(np.searchsorted(batch[0], batch[0][-1] - round(seconds * 1e9), side="left"))
+        return [column[start:] for column in batch]
+
+    def get(self, seq: int):
+        """
+        Frame by sequence number (0 = first frame since clear). Returns None once overwritten.
+        """
+        if not self.total - len(self) <= seq < self.total: return None
+        slot = (self.head - (self.total - seq)) % self.capacity
+        return self.ts_ns[slot], self.frameids[slot], self.payloads[slot, :self.dlcs[slot]]
+
+class Latest_Value_Cache:
+    def __init__(self, static_cols: int = 4):
+        """
+        Last frame seen for every arbitration ID, one row per ID (new IDs are appended as they appear).
+
+        Columns are the FRC view's: static_cols describing the ID (type, mfg, number, API),
+        then one per payload byte. dirty marks the cells that changed since take_dirty().
+        """
+        self.static_cols = static_cols
+        self.rows = {}  # frameid -> row
+        self.size = 0
+        self.grow(64)
+
+    def __len__(self): return self.size
+
+    def grow(self, capacity):
+        old = self.size
+        for name, shape, dtype in (("frameids", (capacity,), np.uint32), ("ts_ns", (capacity,), np.int64),
+                                   ("payloads", (capacity, 8), np.uint8), ("dlcs", (capacity,), np.uint8),
+                                   ("counts", (capacity,), np.int64), ("dirty", (capacity, self.static_cols + 8), bool)):
+            column = np.zeros(shape, dtype=dtype)
+            if old: column[:old] = getattr(self, name)[:old]
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def clear(self):
+        self.rows = {}
+        self.size = 0
+        self.dirty[:] = False
+
+    def update(self, batch):
+        ts_ns, frameids, payloads, dlcs = batch[:4]
+        n = len(frameids)
+        if not n: return
+
+        # Last occurrence of each ID in the batch, plus how often it appeared
+        ids, last_rev, counts = np.unique(frameids[::-1], return_index=True, return_counts=True)
+        last = n - 1 - last_rev
+
+        rows = np.empty(len(ids), dtype=np.int64)
+        new_rows = []
+        for i, frameid in enumerate(ids.tolist()):
+            row = self.rows.get(frameid)
+            if row is None:
+                row = self.rows[frameid] = self.size + len(new_rows)
+                new_rows.append(row)
+            rows[i] = row
+
+        if self.size + len(new_rows) > self.capacity: self.grow(max(2 * self.capacity, self.size + len(new_rows)))
+        if new_rows:
+            new_rows = np.array(new_rows)
+            self.dirty[new_rows] = True
+            self.payloads[new_rows] = 0
+            self.dlcs[new_rows] = 0
+            self.counts[new_rows] = 0
+            self.size += len(new_rows)
+
+        new_payloads, new_dlcs = payloads[last], dlcs[last]
+        changed = (self.payloads[rows] != new_payloads) | (self.dlcs[rows] != new_dlcs)[:, None]
+        self.dirty[rows, self.static_cols:] |= changed
+
+        self.frameids[rows] = ids
+        self.ts_ns[rows] = ts_ns[last]
+        self.payloads[rows] = new_payloads
+        self.dlcs[rows] = new_dlcs
+        self.counts[rows] += counts
+
+    def take_dirty(self):
+        """
+        Returns [(row, first_col, last_col)] spans covering every changed cell, and clears them.
+        """
+        dirty = self.dirty[:self.size]
+        rows = np.flatnonzero(dirty.any(axis=1))
+        spans = []
+        for row in rows.tolist():
+            cols = np.flatnonzero(dirty[row])
+            spans.append((row, int(cols[0]), int(cols[-1])))
+        dirty[rows] = False
+        return spans
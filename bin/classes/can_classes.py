@@ -1,134 +1,479 @@
 import time
-import can
+import threading
+from collections import deque
+from functools import cached_property
+import numpy as np
 import bin.formats.vars as vars
 import bin.funcs.can_functions as cf
 import bin.funcs.global_functions as gf
+from bin.classes.replay_classes import Replay_Cursor, Replay_Scheduler
+from bin.classes.buffer_classes import Frame_Ring_Buffer, Latest_Value_Cache
+from bin.classes.recorder_classes import CAN_Recorder
+from bin.classes.analytics_classes import Bus_Load_Analyzer
+from bin.classes.liveness_classes import Liveness_Tracker
+from bin.classes.profiler_classes import PIPELINE_STATS
 from bin.lib.FRC_CAN_Lib.device_identifier import identify_device
+from bin.lib.FRC_CAN_Lib import decoder, id_codec
 
-class CAN_bus:
-    def __init__(self):
-        self.bus = can.interface.Bus(interface=vars.innoMakerCANtool_interface,channel="1",bitrate=vars.can_baudrate)
-        self.reader = can.BufferedReader()
-        self.notifier = can.Notifier(self.bus, [self.reader])
+class Batch_Queue:
+    def __init__(self, max_frames: int, on_drop=None):
+        # Bounded in frames; when full the oldest batches are dropped, counted and passed to on_drop
+        self.max_frames = max_frames
+        self.on_drop = on_drop
+        self.batches = deque()
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.frames = 0
+        self.dropped_frames = 0
+        self.dropped_batches = 0
 
-    def read_can_messages(self):
-        msgs = []
-        for _ in range(vars.max_can_read):
-            msg = self.reader.get_message(timeout=0.0)
-            if msg:
+    def put(self, batch):
+        with self.lock:
+            self.batches.append(batch)
+            self.frames += len(batch[0])
+            while self.frames > self.max_frames and len(self.batches) > 1:
+                dropped = self.batches.popleft()
+                self.frames -= len(dropped[0])
+                self.dropped_frames += len(dropped[0])
+                self.dropped_batches += 1
+                if self.on_drop: self.on_drop(dropped)
+        self.ready.set()
+
+    def get_all(self):
+        with self.lock:
+            batches, self.batches, self.frames = list(self.batches), deque(), 0
+            self.ready.clear()
+        return batches
+
+    def wait(self, timeout: float): return self.ready.wait(timeout)
+
+class CAN_Receiver(threading.Thread):
+    def __init__(self, reader, can_filters: list = None):
+        # can_filters are applied here, per batch, only when the bus can't filter them itself
+        super().__init__(daemon=True)
+        self.reader = reader
+        self.can_filters = can_filters
+        self.consumers = []
+        self.running = True
+        self.frames_received = 0
+        self.frames_filtered = 0
+        self.batches_received = 0
+
+    def add_consumer(self, max_frames: int = vars.rx_queue_frames):
+        queue = Batch_Queue(max_frames)
+        self.consumers.append(queue)
+        return queue
+
+    def remove_consumer(self, queue):
+        self.consumers = [q for q in self.consumers if q is not queue]
+
+    def run(self):
+        while self.running:
+            msg = self.reader.get_message(timeout=vars.rx_poll_timeout)
+            if msg is None: continue
+
+            # Drain everything already buffered, converting in batches
+            start = time.perf_counter_ns()
+            msgs = [msg]
+            while len(msgs) < vars.rx_batch_size:
+                msg = self.reader.get_message(timeout=0.0)
+                if msg is None: break
                 msgs.append(msg)
-            else:
-                break
-        return msgs
+            PIPELINE_STATS.add("receive", time.perf_counter_ns() - start, len(msgs))
+
+            batch = cf.convert_msgs_array(msgs)
+            self.frames_received += len(msgs)
+            if self.can_filters:
+                keep = cf.match_can_filters(batch[1], self.can_filters, batch[4])
+                if not keep.all():
+                    self.frames_filtered += len(msgs) - int(keep.sum())
+                    if not keep.any(): continue
+                    batch = [col[keep] for col in batch]
+            self.batches_received += 1
+            for queue in self.consumers: queue.put(batch)
+
+    def stop(self):
+        self.running = False
+        if self.is_alive(): self.join()
+
+class CAN_Transmitter(threading.Thread):
+    def __init__(self, bus, max_frames: int = vars.tx_queue_frames):
+        """
+        Sends queued frames on its own thread. send() only appends to a bounded queue, so the
+        caller never waits on the adapter: when its TX buffer is full the worker backs off and
+        retries while frames pile up in the queue, and past max_frames the oldest are dropped.
+        """
+        super().__init__(daemon=True)
+        self.bus = bus
+        self.queue = Batch_Queue(max_frames, self.count_dropped)
+        self.running = True
+
+        self.sent = 0
+        self.retries = 0
+        self.failed = 0
+        self.id_stats = {}     # frameid -> [sent, failed, latency sum ns, max latency ns], worker thread only
+        self.id_dropped = {}   # frameid -> frames dropped from the full queue, producer side
+        self.latency_ms = deque(maxlen=vars.tx_latency_samples)
+
+    def send(self, frameids: list, datas: list, extended: list):
+        # Never blocks: one queue entry per call, stamped for the send latency
+        if frameids: self.queue.put([frameids, datas, extended, time.perf_counter_ns()])
+
+    def count_dropped(self, batch):
+        for frameid in batch[0]: self.id_dropped[frameid] = self.id_dropped.get(frameid, 0) + 1
+
+    # ---------------- Thread ----------------
+    def run(self):
+        while self.running:
+            self.queue.wait(vars.rx_poll_timeout)
+            for batch in self.queue.get_all(): self.send_batch(batch)
+        for batch in self.queue.get_all(): self.send_batch(batch)  # one attempt each for what is left
+
+    def stop(self):
+        self.running = False
+        if self.is_alive(): self.join()
+
+    def send_batch(self, batch):
+        import can
+        start = time.perf_counter_ns()
+        frameids, datas, extended, queued_ns = batch
+        msgs = [can.Message(arbitration_id=frameid, data=data, is_extended_id=ext)
+                for frameid, data, ext in zip(frameids, datas, extended)]
+
+        for msg in msgs:
+            sent = self.send_msg(msg)
+            latency_ns = time.perf_counter_ns() - queued_ns
+            stats = self.id_stats.get(msg.arbitration_id)
+            if stats is None: stats = self.id_stats[msg.arbitration_id] = [0, 0, 0, 0]
+            if not sent:
+                stats[1] += 1
+                continue
+            stats[0] += 1
+            stats[2] += latency_ns
+            stats[3] = max(stats[3], latency_ns)
+            self.latency_ms.append(latency_ns / 1e6)
+        PIPELINE_STATS.add("transmit", time.perf_counter_ns() - start, len(msgs))
 
     def send_msg(self, msg):
-        for _ in range(5):
+        # Backpressure: a full adapter buffer raises CanError, so wait a little and try again
+        import can
+        for attempt in range(vars.tx_max_attempts):
             try:
-                self.bus.send(msg)
-                return
+                self.bus.send(msg, timeout=vars.tx_send_timeout)
+                self.sent += 1
+                return True
             except can.CanError:
-                gf.wait(vars.can_ds)
-        print("Message NOT sent")
+                if not self.running: break
+                self.retries += 1
+                time.sleep(vars.tx_backoff_s)
+        self.failed += 1
+        return False
+
+    # ---------------- Stats ----------------
+    def get_stats(self):
+        stats = {"sent": self.sent, "queued": self.queue.frames, "dropped": self.queue.dropped_frames,
+                 "failed": self.failed, "retries": self.retries}
+        if self.latency_ms:
+            latency_ms = np.array(self.latency_ms)
+            for p in (50, 99): stats[f"p{p}_latency_ms"] = round(float(np.percentile(latency_ms, p)), 3)
+            stats["max_latency_ms"] = round(float(latency_ms.max()), 3)
+
+        ids = {}
+        for frameid in sorted(set(self.id_stats) | set(self.id_dropped)):
+            sent, failed, latency_sum_ns, latency_max_ns = self.id_stats.get(frameid, [0, 0, 0, 0])
+            ids[hex(frameid)] = {"sent": sent, "failed": failed, "dropped": self.id_dropped.get(frameid, 0),
+                                 "mean_latency_ms": round(latency_sum_ns / sent / 1e6, 3) if sent else None,
+                                 "max_latency_ms": round(latency_max_ns / 1e6, 3)}
+        stats["ids"] = ids
+        return stats
+
+class CAN_bus:
+    def __init__(self, can_filters: list = None):
+        import can
+        self.can_filters = can_filters
+        # Filters go to the bus, which filters in its driver or hardware, or else in python-can's recv.
+        # Interfaces known not to filter would only get that per-message check, so the receiver masks
+        # whole batches instead
+        self.bus_filtered = bool(can_filters) and vars.innoMakerCANtool_interface not in vars.software_filter_interfaces
+        self.bus = can.interface.Bus(interface=vars.innoMakerCANtool_interface,channel="1",bitrate=vars.can_baudrate,
+                                     can_filters=can_filters if self.bus_filtered else None)
+        self.reader = can.BufferedReader()
+        self.notifier = can.Notifier(self.bus, [self.reader])
+        self.receiver = CAN_Receiver(self.reader, None if self.bus_filtered else can_filters)
+        self.rx_queue = self.receiver.add_consumer()
+        self.receiver.start()
+        self.transmitter = CAN_Transmitter(self.bus)
+        self.transmitter.start()
+
+    def read_can_messages(self):
+        return self.rx_queue.get_all()
+
+    def get_rx_stats(self):
+        return {"received": self.receiver.frames_received, "filtered": self.receiver.frames_filtered,
+                "bus_filtered": self.bus_filtered, "queued": self.rx_queue.frames,
+                "dropped": self.rx_queue.dropped_frames, "dropped_batches": self.rx_queue.dropped_batches}
+
+    def send_msgs(self, frameids: list, datas: list, extended: list): self.transmitter.send(frameids, datas, extended)
+
+    def get_tx_stats(self): return self.transmitter.get_stats()
 
     def stop_bus(self):
+        self.transmitter.stop()
+        self.receiver.stop()
+        self.notifier.stop()
         self.bus.shutdown()
 
 class Live_CAN_System:
-    def __init__(self):
+    def __init__(self, buffer_frames: int | None = None, buffer_seconds: float | None = None, can_filters: list = None):
         self.logging_type = "Live"
         self.logging_source = "Innomaker"
-        self.cb = CAN_bus()
+        self.cb = CAN_bus(can_filters)
 
         self.ts_start = 0
-        self.can_frames = []
-        self.cntrs_obj = []
-        self.cntrs_global_ids = []
+        self.frames = Frame_Ring_Buffer(buffer_frames, buffer_seconds)
+        self.latest = Latest_Value_Cache()
+        self.bus_load = Bus_Load_Analyzer()
+        self.cntrs = Controller_Registry(self)
+        self.liveness = Liveness_Tracker(self.cntrs)
+        self.replay = None
+        self.recorder = None
 
     def read_can_msgs(self):
-        msgs = self.cb.read_can_messages()
-        for msg in msgs:
-            if self.ts_start == 0: self.ts_start = msg.timestamp
-            self.can_frames.append(CAN_Frame(self,msg))
-        return msgs
+        batches = self.cb.read_can_messages()
+        for batch in batches:
+            if self.ts_start == 0: self.ts_start = batch[0][0] / 1e9
+            self.cntrs.update(batch[0], batch[1])
+            with PIPELINE_STATS.time("analyze", len(batch[0])):
+                self.frames.extend(batch)
+                self.latest.update(batch)
+                self.bus_load.update(batch)
+                self.liveness.update(batch[0], batch[1])
+        self.liveness.tick()
+        return batches
 
-    def send_can_msgs(self, frames):
-        if not frames: return
-        for frame in frames:
-            msg = can.Message(arbitration_id=frame.frameid,data=frame.data,is_extended_id=False)
-            self.cb.send_msg(msg)
+    def clear(self):
+        self.frames.clear()
+        self.latest.clear()
+        self.bus_load.clear()
+        self.cntrs = Controller_Registry(self)
+        self.liveness = Liveness_Tracker(self.cntrs)
 
-    def add_cntr(self, global_id):
-        self.cntrs_global_ids.append(global_id)
-        self.cntrs_obj.append(Controller(self, global_id))
+    def send_can_msgs(self, frameids: list, datas: list, extended: list):
+        # Queued for the transmitter thread, returns right away
+        self.cb.send_msgs(frameids, datas, extended)
+
+    def start_replay(self, can_log, speed: float | str = 1.0, profile: bool = None):
+        # Replays on its own thread so deadlines don't depend on the GUI timer
+        self.replay = Replay_Scheduler(can_log, self.send_can_msgs, speed)
+        self.replay_thread = threading.Thread(target=gf.profile_job, args=("replay", self.replay.run),
+                                              kwargs={"profile": profile}, daemon=True)
+        self.replay_thread.start()
+
+    def start_recording(self, fmt: str["csv", "binary"] = None):
+        # The recorder gets its own receiver queue, so a slow disk never holds up the display path
+        if self.recorder: return self.recorder
+        queue = self.cb.receiver.add_consumer(vars.record_queue_frames)
+        self.recorder = CAN_Recorder(queue, fmt)
+        self.recorder.start()
+        return self.recorder
+
+    def stop_recording(self):
+        if not self.recorder: return None
+        self.cb.receiver.remove_consumer(self.recorder.queue)
+        self.recorder.stop()
+        recorder, self.recorder = self.recorder, None
+        return recorder
 
     def end_live_CAN_system(self):
+        self.stop_recording()
+        if self.replay:
+            self.replay.stop()
+            self.replay_thread.join()
         self.cb.stop_bus()
 
 class CAN_log:
     def __init__(self, can_data, logging_source: str["Innomaker", "GUI CSV Output"]):
+        """
+        Columns: int64 ns timestamps, uint32 frame ids, (N, 8) uint8 payloads, uint8 DLCs, uint8 flags.
+
+        The time range, controllers and replay cursor are built on first use, a chunk at a time,
+        so opening a memory-mapped capture reads nothing from it.
+        """
         self.logging_source = logging_source
         self.logging_type = "Log"
-        self.ts_start = float("inf")
-        self.ts_end = 0
-        self.can_frames,self.cntrs_obj,self.cntrs_global_ids = [],[],[]
+        self.ts_ns, self.frameids, self.payloads, self.dlcs, self.flags = can_data
+
+    def get_chunks(self):
+        chunk = vars.ingest_chunk_rows
+        return [slice(s, s + chunk) for s in range(0, len(self.frameids), chunk)]
 
-        for msg in can_data: self.can_frames.append(CAN_Frame(self, msg))
-        for frame in self.can_frames: frame.rel_ts = frame.ts - self.ts_start
+    @cached_property
+    def ts_range_ns(self):
+        # First and last timestamp of the frames with a valid API, else of all frames
+        valid, every = [], []
+        for rows in self.get_chunks():
+            ts_ns = np.asarray(self.ts_ns[rows])
+            every += [ts_ns.min(), ts_ns.max()]
+            ts_ns = ts_ns[~np.isin(id_codec.get_api_array(self.frameids[rows]), vars.bad_apis)]
+            if len(ts_ns): valid += [ts_ns.min(), ts_ns.max()]
+        times = valid or every or [0]
+        return int(min(times)), int(max(times))
 
-    def add_cntr(self, global_id):
-        self.cntrs_global_ids.append(global_id)
-        self.cntrs_obj.append(Controller(self, global_id))
+    @property
+    def ts_start_ns(self): return self.ts_range_ns[0]
+    @property
+    def ts_end_ns(self): return self.ts_range_ns[1]
+    @property
+    def ts_start(self): return self.ts_range_ns[0] / 1e9
+    @property
+    def ts_end(self): return self.ts_range_ns[1] / 1e9
+
+    @cached_property
+    def cntrs(self):
+        cntrs = Controller_Registry(self)
+        for rows in self.get_chunks(): cntrs.update(self.ts_ns[rows], self.frameids[rows])
+        return cntrs
+
+    @cached_property
+    def cursor(self): return Replay_Cursor(self)
+
+    def get_rel_ts(self, rows): return (self.ts_ns[rows] - self.ts_start_ns) / 1e9
 
     def get_cntr_table(self):
         table = []
-        for cntr in self.cntrs_obj: table.append(cntr.get_table())
+        for cntr in self.cntrs: table.append(cntr.get_table())
         return table
 
+    def get_frame(self, i):
+        msg = (self.ts_ns[i] / 1e9, int(self.frameids[i]), self.payloads[i, :self.dlcs[i]].tolist())
+        return CAN_Frame(self, msg)
+
     def get_msgs(self, start_time, prev_time):
-        msgs = []
         start_rel = prev_time - start_time
         end_rel = gf.get_time("epoch") - start_time
 
-        if start_rel == 0: return [self.can_frames[0]]
+        # First tick of a replay rewinds the cursor, after that it only moves forward
+        if start_rel == 0: self.cursor.reset()
+
+        idx = self.cursor.advance(end_rel)
+        with PIPELINE_STATS.time("convert", len(idx)): return [self.get_frame(i) for i in idx]
+
+    def seek(self, rel_ts: float): self.cursor.seek(rel_ts)
+
+    def get_bus_load(self):
+        bus_load = Bus_Load_Analyzer()
+        bus_load.update([self.ts_ns, self.frameids, self.payloads, self.dlcs, self.flags])
+        return bus_load.report()
+
+    def get_signals(self, frameid: int, model: str = None):
+        # Time series of every decoded field of one arbitration ID, aligned with its timestamps.
+        # Decoded with the layout of model, else of the controller's identified model
+        rows = np.flatnonzero(self.frameids == frameid)
+        api = id_codec.get_api(frameid)
+
+        if model is None:
+            cntr = self.cntrs.get(id_codec.get_global_key(frameid))
+            model = cntr.get_model() if cntr else None
+            if model is None: return [self.get_rel_ts(rows), {"error": "Unknown device type"}]
+
+        with PIPELINE_STATS.time("decode", len(rows)):
+            return [self.get_rel_ts(rows), decoder.decode_batch(model, api, self.payloads[rows])]
+
+class CAN_Log_Stream:
+    def __init__(self, logging_source: str["Innomaker", "GUI CSV Output", "FRC Capture"]):
+        # Controller table of a log fed chunk by chunk; frames themselves are not kept
+        self.logging_source = logging_source
+        self.logging_type = "Log"
+        self.cntrs = Controller_Registry(self)
+        self.frames = 0
+        self.ts_start_ns = None
+        self.ts_end_ns = None
 
-        for frame in self.can_frames:
-            if start_rel < frame.rel_ts <= end_rel:
-                msgs.append(frame)
+    def update(self, ts_ns, frameids, frames: int = None):
+        # frames: size of the chunk before invalid frames were split off, if it differs
+        self.cntrs.update(ts_ns, frameids)
+        self.frames += len(frameids) if frames is None else frames
+        if not len(ts_ns): return
+        start_ns, end_ns = int(ts_ns.min()), int(ts_ns.max())
+        self.ts_start_ns = start_ns if self.ts_start_ns is None else min(self.ts_start_ns, start_ns)
+        self.ts_end_ns = end_ns if self.ts_end_ns is None else max(self.ts_end_ns, end_ns)
 
-        return msgs
+    def get_cntr_table(self):
+        table = []
+        for cntr in self.cntrs: table.append(cntr.get_table())
+        return table
 
 class CAN_Frame:
     def __init__(self, system, msg):
         self.system = system
-        if system.logging_type == "Log":
-            self.ts = gf.convert_time(msg[0], "epoch")
-            self.frameid = cf.convert_frameid(msg[1],"Int")
-            self.data = cf.convert_data(msg[2], system, "List")
-        elif system.logging_type == "Live":
-            self.ts = msg.timestamp
-            self.frameid = cf.convert_frameid(msg.arbitration_id,"Int")
-            self.data = cf.convert_data(msg.data, system, "List")
-        self.global_id, self.api = cf.get_frameid_info(self.frameid)
+        self.ts, self.frameid, self.data = msg
+        self.rel_ts = self.ts - system.ts_start
+        device_type, mfg, self.api, device_number = id_codec.decode_id(self.frameid)
+        self.global_id = [device_type, mfg, device_number]
         if self.api in vars.bad_apis: return
         self.find_cntr()
-        if self.system.logging_type == "Log": self.update_log()
 
     def find_cntr(self):
-        if self.global_id not in self.system.cntrs_global_ids:
-            self.system.add_cntr(self.global_id)
+        self.cntr = self.system.cntrs.get_or_add(id_codec.get_global_key(self.frameid))
+
+class Controller_Registry:
+    def __init__(self, system):
+        # {packed global id: Controller}, in order of first appearance
+        self.system = system
+        self.cntrs = {}
+
+    def __len__(self): return len(self.cntrs)
+    def __iter__(self): return iter(list(self.cntrs.values()))
+
+    def get(self, global_key: int): return self.cntrs.get(global_key)
+
+    def get_or_add(self, global_key: int):
+        cntr = self.cntrs.get(global_key)
+        if cntr is None:
+            cntr = self.cntrs[global_key] = Controller(self.system, id_codec.get_global_id(global_key))
+        return cntr
 
-        for cntr in self.system.cntrs_obj:
-            if cntr.global_id == self.global_id:
-                self.cntr = cntr
+    def update(self, ts_ns, frameids):
+        """
+        Adds a batch of frames (or a whole log) to the controllers' API lists and traffic counters.
+        Work per batch is a few grouped NumPy passes plus one dict hit per distinct frame id.
+        """
+        with PIPELINE_STATS.time("lookup", len(frameids)): self.add_frames(ts_ns, frameids)
 
-    def update_log(self):
-        if self.ts < self.system.ts_start:
-            self.system.ts_start = self.ts
-        if self.ts > self.system.ts_end:
-            self.system.ts_end = self.ts
+    def add_frames(self, ts_ns, frameids):
+        ts_ns, frameids = np.asarray(ts_ns), np.asarray(frameids, dtype=np.uint32)
+        valid = ~np.isin(id_codec.get_api_array(frameids), vars.bad_apis)
+        ts_ns, frameids = ts_ns[valid], frameids[valid]
+        if not len(frameids): return
 
-        if self.api not in self.cntr.apis:
-            self.cntr.apis.append(self.api)
+        # Frames per (controller, api), ordered by first appearance
+        ids, first, counts = np.unique(frameids, return_index=True, return_counts=True)
+        order = np.argsort(first)
+        for frameid, count in zip(ids[order].tolist(), counts[order].tolist()):
+            cntr = self.get_or_add(id_codec.get_global_key(frameid))
+            cntr.add_api(id_codec.get_api(frameid), count)
+
+        # Group frames by controller (time order kept) for first/last seen and inter-arrival gaps
+        keys = frameids & id_codec.GLOBAL_KEY_MASK
+        by_key = np.argsort(keys, kind="stable")
+        keys, ts_ns = keys[by_key], ts_ns[by_key]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(keys)]
+
+        gaps_ms = np.diff(ts_ns) / 1e6
+        gap_bins = np.maximum(np.searchsorted(vars.interarrival_bins_ms, gaps_ms, side="right") - 1, 0)
+        same_cntr = keys[1:] == keys[:-1]
+
+        for key, start, end in zip(keys[starts].tolist(), starts.tolist(), ends.tolist()):
+            cntr = self.cntrs[key]
+            if cntr.last_ts_ns is not None:
+                gap_ms = (ts_ns[start] - cntr.last_ts_ns) / 1e6
+                cntr.interarrival_hist[max(np.searchsorted(vars.interarrival_bins_ms, gap_ms, side="right") - 1, 0)] += 1
+            else:
+                cntr.first_ts_ns = int(ts_ns[start])
+            cntr.interarrival_hist += np.bincount(gap_bins[start:end - 1][same_cntr[start:end - 1]], minlength=len(vars.interarrival_bins_ms))
+            cntr.last_ts_ns = int(ts_ns[end - 1])
+            cntr.frames += end - start
 
 class Controller:
     def __init__(self, system, global_id):
@@ -139,24 +484,46 @@ class Controller:
         self.mfg = global_id[1]
         self.id = global_id[2]
         self.apis = []
+        self.api_set = set()
+        self.model_apis = -1  # API count the cached model was scored with
+
+        # Traffic counters, kept up to date by Controller_Registry.update
+        self.frames = 0
+        self.api_counts = {}
+        self.first_ts_ns = None
+        self.last_ts_ns = None
+        self.interarrival_hist = np.zeros(len(vars.interarrival_bins_ms), dtype=np.int64)
     
         if self.system.logging_type == "Live":
             self.detect_time = time.time()
             self.last_seen = time.time()
-            self.latency = 0
+            self.latency = 0  # mean arrival jitter [ms], kept up to date by Liveness_Tracker
+            self.missed = 0
             self.status = "Online"
 
-    def device_seen(self):
-        self.latency = time.time() - self.last_seen
-        self.last_seen = time.time()
-        self.status = "Online"
+    def get_table(self): return [self.get_model(),self.get_mfg("str"),self.get_id("str"),self.apis]
+    def add_api(self, api, frames: int = 0):
+        self.api_counts[api] = self.api_counts.get(api, 0) + frames
+        if api in self.api_set: return
+        self.api_set.add(api)
+        self.apis.append(api)
+
+    def get_fps(self):
+        if self.first_ts_ns is None or self.last_ts_ns == self.first_ts_ns: return 0.0
+        return (self.frames - 1) / ((self.last_ts_ns - self.first_ts_ns) / 1e9)
 
-    def ping_device(self):
-        if time.time() - self.last_seen > vars.cntr_offline_debounce:
-            self.status = "Offline"
+    def get_stats(self):
+        return {"frames": self.frames, "fps": round(self.get_fps(), 2), "api_counts": dict(self.api_counts),
+                "first_ts": self.first_ts_ns / 1e9 if self.first_ts_ns is not None else None,
+                "last_ts": self.last_ts_ns / 1e9 if self.last_ts_ns is not None else None,
+                "interarrival_ms": dict(zip(vars.interarrival_bins_ms, self.interarrival_hist.tolist()))}
 
-    def get_table(self): return [self.get_model(),self.get_mfg("str"),self.get_id("str"),self.apis]
-    def get_model(self): return identify_device(self)
+    def get_model(self):
+        # Re-scored only after a new API has been seen
+        if self.model_apis != len(self.apis):
+            with PIPELINE_STATS.time("identify"): self.model = identify_device(self)
+            self.model_apis = len(self.apis)
+        return self.model
     def get_device_type(self, fmt): return cf.get_device_type(self.device_type, fmt)
     def get_mfg(self, fmt): return cf.get_mfg(self.mfg, fmt)
     def get_id(self, fmt): return cf.get_id(self.id, fmt)
\ No newline at end of file
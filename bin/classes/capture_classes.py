@@ -0,0 +1,144 @@
+import os
+import time
+import struct
+import numpy as np
+import bin.formats.vars as vars
+from bin.lib.FRC_CAN_Lib import id_codec
+
+# ------------------------------------------------------------
+# File layout: header | records, written in chunks | chunk index | trailer
+#
+# Every record is fixed-size, so record i is always at HEADER.size + i * 24 and the
+# whole record area can be memory-mapped as one structured array. The chunk index
+# (first record, count, time range) is appended on close; a file without it (e.g. an
+# interrupted recording) is still readable, only without per-chunk time bounds.
+# ------------------------------------------------------------
+MAGIC = b"FRCCAN"
+VERSION = 1
+HEADER = struct.Struct("<6sHHIq10x")  # magic, version, record size, chunk frames, created [epoch ns]
+TRAILER = struct.Struct("<qq4s")      # chunk index offset, chunk count, tag
+TRAILER_TAG = b"CIDX"
+
+FLAG_EXTENDED = id_codec.FLAG_EXTENDED
+
+RECORD_DTYPE = np.dtype([("ts_ns", "<i8"), ("frameid", "<u4"), ("flags", "u1"), ("dlc", "u1"),
+                         ("pad", "V2"), ("data", "u1", (8,))])
+CHUNK_DTYPE = np.dtype([("first", "<i8"), ("count", "<i8"), ("ts_min", "<i8"), ("ts_max", "<i8")])
+
+
+class Capture_Writer:
+    def __init__(self, path: str, chunk_frames: int | None = None):
+        self.path = path
+        self.chunk_frames = chunk_frames or vars.capture_chunk_frames
+
+        self.f = open(path, "wb")
+        self.f.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize, self.chunk_frames, time.time_ns()))
+
+        self.chunks = []
+        self.pending = []
+        self.pending_frames = 0
+        self.frames = 0
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    def write(self, batch):
+        """
+        Appends a columnar batch [ts_ns, frameids, payloads, dlcs, flags].
+        """
+        ts_ns, frameids, payloads, dlcs, flags = batch
+        records = np.zeros(len(frameids), dtype=RECORD_DTYPE)
+        records["ts_ns"] = ts_ns
+        records["frameid"] = frameids
+        records["flags"] = flags
+        records["dlc"] = dlcs
+        records["data"] = payloads
+
+        self.pending.append(records)
+        self.pending_frames += len(records)
+        if self.pending_frames >= self.chunk_frames:
+            pending = np.concatenate(self.pending)
+            full = len(pending) - len(pending) % self.chunk_frames
+            for start in range(0, full, self.chunk_frames):
+                self.write_chunk(pending[start:start + self.chunk_frames])
+            self.pending = [pending[full:]]
+            self.pending_frames = len(pending) - full
+
+    def write_chunk(self, records):
+        if not len(records): return
+        self.chunks.append((self.frames, len(records), records["ts_ns"].min(), records["ts_ns"].max()))
+        records.tofile(self.f)
+        self.frames += len(records)
+
+    def flush(self):
+        # Writes what is pending as a (short) chunk so it is on disk
+        if self.pending_frames:
+            self.write_chunk(np.concatenate(self.pending))
+            self.pending, self.pending_frames = [], 0
+        self.f.flush()
+
+    def close(self):
+        if self.f.closed: return
+        self.flush()
+        offset = self.f.tell()
+        np.array(self.chunks, dtype=CHUNK_DTYPE).tofile(self.f)
+        self.f.write(TRAILER.pack(offset, len(self.chunks), TRAILER_TAG))
+        self.f.close()
+
+
+class Capture_Reader:
+    def __init__(self, path: str):
+        """
+        Memory-maps a capture file. records and the get_can_data() columns are views into
+        the file, pages are only read when they are touched.
+        """
+        self.path = path
+        size = os.path.getsize(path)
+
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"Not a capture file: {path}")
+            _, self.version, record_size, self.chunk_frames, self.created_ns = HEADER.unpack(header)
+            if self.version != VERSION or record_size != RECORD_DTYPE.itemsize:
+                raise ValueError(f"Unsupported capture version {self.version} (record size {record_size}): {path}")
+
+            # Chunk index from the trailer, or every whole record if the file was never closed
+            trailer = None
+            if size >= HEADER.size + TRAILER.size:
+                f.seek(size - TRAILER.size)
+                trailer = TRAILER.unpack(f.read(TRAILER.size))
+            if trailer and trailer[2] == TRAILER_TAG:
+                offset, n_chunks, _ = trailer
+                f.seek(offset)
+                self.chunks = np.fromfile(f, dtype=CHUNK_DTYPE, count=n_chunks)
+                n = (offset - HEADER.size) // record_size
+            else:
+                self.chunks = None
+                n = (size - HEADER.size) // record_size
+
+        if n: self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(n,))
+        else: self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self): return len(self.records)
+
+    def get_can_data(self, records=None):
+        # Columnar [ts_ns, frameids, payloads (N, 8), dlcs, flags], as views of the mapped records
+        records = self.records if records is None else records
+        return [records["ts_ns"], records["frameid"], records["data"], records["dlc"], records["flags"]]
+
+    def get_chunk(self, i: int):
+        first, count = int(self.chunks["first"][i]), int(self.chunks["count"][i])
+        return self.records[first:first + count]
+
+    def window(self, start_ns: int, end_ns: int):
+        """
+        Records of every chunk overlapping [start_ns, end_ns]. Without a chunk index the
+        whole file is returned.
+        """
+        if self.chunks is None: return self.records
+        hits = np.flatnonzero((self.chunks["ts_max"] >= start_ns) & (self.chunks["ts_min"] <= end_ns))
+        if not len(hits): return self.records[:0]
+        first = int(self.chunks["first"][hits[0]])
+        last = int(self.chunks["first"][hits[-1]] + self.chunks["count"][hits[-1]])
+        return self.records[first:last]
@@ -1,12 +1,19 @@
+import os
 import sys
-from PyQt5.QtWidgets import (QMainWindow, QWidget, QStackedWidget, QTableWidgetItem)
+import time
+import queue
+import threading
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QStackedWidget, QTableWidgetItem)
 from PyQt5.QtCore import QTimer
 
 from bin.classes.screen_classes import (NavigationScreen,InputScreen,PPResultsScreen,LiveCANScreen,LiveDetectScreen)
 from bin.formats.gui_formats import GUI_CONFIG, DARK_STYLE
-from bin.funcs.global_functions import get_global_logger
+from bin.funcs.global_functions import get_global_logger, log_startup_report, profile_job, STARTUP_MARKS
+import bin.formats.vars as vars
 import bin.funcs.can_functions as cf
 from bin.classes.can_classes import Live_CAN_System
+from bin.classes.profiler_classes import PIPELINE_STATS
+from bin.classes.model_classes import Live_Frame_Model, Latest_Value_Model
 
 
 # ============================================================
@@ -18,6 +25,8 @@ class LiveCANScreenClass(QWidget):
         self.main = main
 
         self.live_can = None  # created on start_monitor/start_replay
+        self.frame_model = None
+        self.value_model = None
 
         self.ui = LiveCANScreen(main)
         # use the layout already set on ui
@@ -28,78 +37,103 @@ class LiveCANScreenClass(QWidget):
         self.timer.timeout.connect(self.update_live_data)
 
         self.ui.pause_btn.clicked.connect(self.toggle_pause)
+        self.ui.record_btn.toggled.connect(self.toggle_record)
         self.ui.clear_btn.clicked.connect(self.clear_table)
         self.ui.back_btn.clicked.connect(self.go_back)
 
         self.paused = False
         self.current_mode = "Standard CAN"
 
-    def start_monitor(self, can_id, mode, timeout):
+    def start_monitor(self, can_filters, mode, timeout):
         self.current_mode = mode
         self.configure_table()
+        PIPELINE_STATS.reset()
 
-        self.live_can = Live_CAN_System()
-        #self.live_can.start_live_CAN_system(can_id, mode, timeout)
+        self.live_can = Live_CAN_System(can_filters=can_filters)
+        self.attach_models()
 
         self.paused = False
         self.timer.start()
 
-    def start_replay(self, can_log, mode):
+    def start_replay(self, can_log, mode, speed, profile=False):
         self.current_mode = mode
         self.configure_table()
+        PIPELINE_STATS.reset()
 
         self.live_can = Live_CAN_System()
-        self.live_can.start_replay(can_log)
+        self.live_can.start_replay(can_log, speed, profile)
+        self.attach_models()
 
         self.paused = False
         self.timer.start()
 
     def configure_table(self):
-        cfg = GUI_CONFIG["auto_detect"]["column_configs"][self.current_mode]
-        table = self.ui.table
-        table.setColumnCount(cfg["count"])
-        table.setHorizontalHeaderLabels(cfg["columns"])
+        self.ui.tail_btn.setVisible(self.current_mode == "Standard CAN")
+        self.ui.record_btn.blockSignals(True)
+        self.ui.record_btn.setChecked(False)
+        self.ui.record_btn.blockSignals(False)
+
+    def attach_models(self):
+        cfgs = GUI_CONFIG["auto_detect"]["column_configs"]
+        standard, frc = cfgs["Standard CAN"], cfgs["FRC"]
+        self.frame_model = Live_Frame_Model(self.live_can.frames, standard["columns"][:standard["count"]])
+        self.value_model = Latest_Value_Model(self.live_can.latest, frc["columns"][:frc["count"]])
+        self.ui.table.setModel(self.frame_model if self.current_mode == "Standard CAN" else self.value_model)
 
     def update_live_data(self):
         if self.paused or self.live_can is None:
             return
 
-        self.live_can.read_can_msgs()
-        frames = self.live_can.can_frames
-        table = self.ui.table
+        batches = self.live_can.read_can_msgs()
+        start = time.perf_counter_ns()
 
         if self.current_mode == "Standard CAN":
-            table.setRowCount(len(frames))
-            for row, f in enumerate(frames):
-                table.setItem(row, 0, QTableWidgetItem(str(f.timestamp)))
-                table.setItem(row, 1, QTableWidgetItem(hex(f.frameid)))
-                table.setItem(row, 2, QTableWidgetItem(f.data_hex))
+            # Only new rows are signalled; the view formats whatever is visible
+            self.frame_model.sync()
+            if self.ui.tail_btn.isChecked(): self.ui.table.scrollToBottom()
         else:
-            cntrs = self.live_can.cntrs_obj
-            table.setRowCount(len(cntrs))
-            for row, cntr in enumerate(cntrs):
-                table.setItem(row, 0, QTableWidgetItem(cntr.get_model()))
-                table.setItem(row, 1, QTableWidgetItem(cntr.get_mfg("str")))
-                table.setItem(row, 2, QTableWidgetItem(str(cntr.get_id("str"))))
-                table.setItem(row, 3, QTableWidgetItem(str(cntr.api)))
-                for i, b in enumerate(cntr.data_bytes):
-                    table.setItem(row, 4 + i, QTableWidgetItem(str(b)))
+            # One row per ID, only the cells whose value changed are repainted
+            self.value_model.sync()
+
+        bus_load = self.live_can.bus_load
+        top = ", ".join(f"{hex(frameid)} {pct}%" for frameid, fps, pct in bus_load.get_top_talkers(3))
+        self.ui.bus_label.setText(f"Bus load {bus_load.get_utilization():.1f}% (peak {bus_load.get_peak():.1f}%)"
+                                  f" | {bus_load.get_fps():.0f} frames/s | Top: {top}")
+        PIPELINE_STATS.add("render", time.perf_counter_ns() - start, sum(len(batch[0]) for batch in batches))
+
+        if self.live_can.frames.total and "first frame on screen" not in STARTUP_MARKS:
+            log_startup_report(self.main.log, "first frame on screen")
 
     def toggle_pause(self):
         self.paused = not self.paused
         self.ui.pause_btn.setText("Resume" if self.paused else "Pause")
 
+    def toggle_record(self, checked):
+        if self.live_can is None: return
+        if checked:
+            self.live_can.start_recording()
+            return
+        recorder = self.live_can.stop_recording()
+        if recorder: self.main.log.info(f"Recording saved to {recorder.files}: {recorder.get_stats()}")
+
     def clear_table(self):
         if self.live_can:
-            self.live_can.can_frames = []
-            self.live_can.cntrs_obj = []
-            self.live_can.cntrs_global_ids = []
-        self.ui.table.setRowCount(0)
+            self.live_can.clear()
+        if self.frame_model:
+            self.frame_model.sync()
+            self.value_model.sync()
 
     def go_back(self):
         self.timer.stop()
         if self.live_can:
+            if self.live_can.recorder: self.main.log.info(f"Recording saved to {self.live_can.recorder.files}: {self.live_can.recorder.get_stats()}")
             self.live_can.end_live_CAN_system()
+            if self.live_can.replay:
+                self.main.log.info(f"Replay report: {self.live_can.replay.report()}")
+                self.main.log.info(f"TX report: {self.live_can.cb.get_tx_stats()}")
+            self.main.log.info(f"RX report: {self.live_can.cb.get_rx_stats()}")
+            self.main.log.info(f"Bus load report: {self.live_can.bus_load.report()}")
+            self.main.log.info(f"Pipeline stats saved to {PIPELINE_STATS.write_log()}")
         self.main.go_rt_menu()
 
 class LiveDetectScreenClass(QWidget):
@@ -120,6 +154,7 @@ class LiveDetectScreenClass(QWidget):
         self.ui.back_btn.clicked.connect(self.go_back)
 
     def start_auto_detect(self):
+        PIPELINE_STATS.reset()
         self.live_can = Live_CAN_System()
         self.timer.start()
 
@@ -128,34 +163,37 @@ class LiveDetectScreenClass(QWidget):
             return
 
         self.live_can.read_can_msgs()
+        self.live_can.liveness.refresh_cntrs()
 
-        cntrs = self.live_can.cntrs_obj
+        cntrs = list(self.live_can.cntrs)
         table = self.ui.table
-        table.setRowCount(len(cntrs))
-
-        for row, cntr in enumerate(cntrs):
-            values = [
-                cntr.get_model(),
-                cntr.get_mfg("str"),
-                cntr.get_id("str"),
-                ", ".join(str(a) for a in sorted(cntr.apis)),
-                cntr.status,
-                f"{cntr.last_seen:.2f}",
-                f"{cntr.latency:.3f}"
-            ]
-            for col, val in enumerate(values):
-                table.setItem(row, col, QTableWidgetItem(val))
+        with PIPELINE_STATS.time("render", len(cntrs)):
+            table.setRowCount(len(cntrs))
+
+            for row, cntr in enumerate(cntrs):
+                values = [
+                    cntr.get_model(),
+                    cntr.get_mfg("str"),
+                    cntr.get_id("str"),
+                    ", ".join(str(a) for a in sorted(cntr.apis)),
+                    f"{cntr.status} ({cntr.missed} missed)" if cntr.missed else cntr.status,
+                    f"{cntr.last_seen:.2f}",
+                    f"{cntr.latency:.3f}"
+                ]
+                for col, val in enumerate(values):
+                    table.setItem(row, col, QTableWidgetItem(val))
 
     def reset_detection(self):
         if self.live_can:
-            self.live_can.can_frames = []
-            self.live_can.cntrs_obj = []
-            self.live_can.cntrs_global_ids = []
+            self.live_can.clear()
 
     def go_back(self):
         self.timer.stop()
         if self.live_can:
+            if self.live_can.recorder: self.main.log.info(f"Recording saved to {self.live_can.recorder.files}: {self.live_can.recorder.get_stats()}")
             self.live_can.end_live_CAN_system()
+            self.main.log.info(f"Liveness report: {self.live_can.liveness.report()}")
+            self.main.log.info(f"Pipeline stats saved to {PIPELINE_STATS.write_log()}")
         self.main.go_home()
 
 class MainWindow(QMainWindow):
@@ -179,6 +217,7 @@ class MainWindow(QMainWindow):
         self.rt_menu = NavigationScreen(self, nav_cfg["rt_menu"])
 
         self.pp_input = InputScreen(self, input_cfg["pp_input"])
+        self.pp_batch_input = InputScreen(self, input_cfg["pp_batch_input"])
         self.live_can_input = InputScreen(self, input_cfg["live_can_input"])
         self.replay_log_input = InputScreen(self, input_cfg["replay_log_input"])
 
@@ -187,11 +226,24 @@ class MainWindow(QMainWindow):
 
         self.pp_results = PPResultsScreen(self)
 
+        # Batch post processing: results arrive from a worker thread, the timer merges them
+        self.batch_results = queue.Queue()
+        self.batch_timer = QTimer()
+        self.batch_timer.setInterval(250)
+        self.batch_timer.timeout.connect(self.update_pp_batch)
+
+        # Pipeline stage rates in the status bar, and in output_files/logs every vars.pipeline_log_s
+        self.stats_timer = QTimer()
+        self.stats_timer.setInterval(vars.pipeline_status_ms)
+        self.stats_timer.timeout.connect(self.update_pipeline_stats)
+        self.stats_timer.start()
+
         for screen in [
             self.home,
             self.rt_setup,
             self.rt_menu,
             self.pp_input,
+            self.pp_batch_input,
             self.live_can_input,
             self.replay_log_input,
             self.auto_detect,
@@ -222,6 +274,12 @@ class MainWindow(QMainWindow):
                 lambda _, a=nav_screen.bottom_button.action: self.handle_action(a)
             )
 
+    def update_pipeline_stats(self):
+        status = PIPELINE_STATS.get_status()
+        if not status: return
+        self.statusBar().showMessage(status)
+        if PIPELINE_STATS.log_due(): PIPELINE_STATS.write_log()
+
     def handle_action(self, action):
         if action == "exit":
             sys.exit(0)
@@ -236,6 +294,12 @@ class MainWindow(QMainWindow):
         )
         self.pp_input.btn_back.clicked.connect(self.go_home)
 
+        # PP batch input
+        self.pp_batch_input.btn_run.clicked.connect(
+            lambda: self.run_pp_batch(self.get_input_values(self.pp_batch_input))
+        )
+        self.pp_batch_input.btn_back.clicked.connect(self.go_home)
+
         # Live CAN input
         self.live_can_input.btn_run.clicked.connect(
             lambda: self.run_live_can(self.get_input_values(self.live_can_input))
@@ -255,7 +319,7 @@ class MainWindow(QMainWindow):
                 values.append(widget.text())
             elif ftype == "dropdown":
                 values.append(widget.currentText())
-            elif ftype == "file":
+            elif ftype in ("file", "folder"):
                 values.append(widget.text())
         return values
 
@@ -266,6 +330,9 @@ class MainWindow(QMainWindow):
     def go_pp(self):
         self.stack.setCurrentWidget(self.pp_input)
 
+    def go_pp_batch(self):
+        self.stack.setCurrentWidget(self.pp_batch_input)
+
     def go_rt(self):
         self.stack.setCurrentWidget(self.rt_setup)
 
@@ -285,29 +352,89 @@ class MainWindow(QMainWindow):
 
     # ---------------- Run actions ----------------
     def run_pp(self, data):
-        file_path, logging_source = data
-        can_log = cf.get_can_from_xlsx(file_path, logging_source)
-        table = can_log.get_cntr_table()
-
-        self.pp_results.table.setRowCount(0)
-        for row_data in table:
-            row = self.pp_results.table.rowCount()
-            self.pp_results.table.insertRow(row)
-            for col, value in enumerate(row_data):
-                if isinstance(value, list):
-                    value = ", ".join(str(v) for v in value)
-                self.pp_results.table.setItem(row, col, QTableWidgetItem(str(value)))
+        file_path, logging_source, log_date, profile = data
+        PIPELINE_STATS.reset()
+        self.fill_pp_table(["Device Type", "Manufacturer", "ID", "APIs"], [])
+        self.stack.setCurrentWidget(self.pp_results)
 
+        # The log is streamed in chunks, the screen is repainted between them
+        def progress(fraction, frames):
+            self.pp_results.status.setText(f"Processing... {fraction:.0%} ({frames} frames)")
+            QApplication.processEvents()
+
+        can_stream = profile_job("pp", cf.stream_can_log, file_path, logging_source, progress, log_date or None,
+                                 profile=profile == "cProfile")
+        self.pp_results.status.setText(f"{can_stream.frames} frames")
+        self.fill_pp_table(None, can_stream.get_cntr_table())
+
+    def run_pp_batch(self, data):
+        directory, logging_source, profile = data
+        logging_source = None if logging_source == "Auto" else logging_source
+        if not os.path.isdir(directory):
+            self.log.warning(f"Batch process: not a folder: {directory}")
+            self.statusBar().showMessage("Select a log folder first")
+            return
+
+        self.batch_inventory = {}
+        self.batch_done = 0
+        self.batch_errors = []
+        self.batch_total = len(cf.find_log_files(directory, logging_source))
+        self.batch_results = queue.Queue()
+
+        def work(results):
+            for result in cf.process_log_dir(directory, logging_source, profile=profile == "cProfile"): results.put(result)
+        threading.Thread(target=work, args=(self.batch_results,), daemon=True).start()
+
+        self.fill_pp_table(["Device Type", "Manufacturer", "ID", "APIs", "Matches"], [])
+        self.update_pp_batch()
+        self.batch_timer.start()
         self.stack.setCurrentWidget(self.pp_results)
 
+    def update_pp_batch(self):
+        changed = False
+        while not self.batch_results.empty():
+            result = self.batch_results.get()
+            self.batch_done += 1
+            if "error" in result:
+                self.batch_errors.append(result["file"])
+                self.log.error(f"Batch process failed on {result['file']}: {result['error']}")
+            cf.merge_cntr_table(self.batch_inventory, result)
+            changed = True
+
+        if changed: self.fill_pp_table(None, cf.get_inventory_table(self.batch_inventory))
+        status = f"{self.batch_done}/{self.batch_total} files processed"
+        if self.batch_errors: status += f", failed: {', '.join(self.batch_errors)}"
+        self.pp_results.status.setText(status)
+        if self.batch_done >= self.batch_total: self.batch_timer.stop()
+
+    def fill_pp_table(self, columns, table):
+        if columns:
+            self.pp_results.table.setColumnCount(len(columns))
+            self.pp_results.table.setHorizontalHeaderLabels(columns)
+
+        with PIPELINE_STATS.time("render", len(table)):
+            self.pp_results.table.setRowCount(0)
+            for row_data in table:
+                row = self.pp_results.table.rowCount()
+                self.pp_results.table.insertRow(row)
+                for col, value in enumerate(row_data):
+                    if isinstance(value, list):
+                        value = ", ".join(str(v) for v in value)
+                    self.pp_results.table.setItem(row, col, QTableWidgetItem(str(value)))
+
     def run_live_can(self, data):
         can_id, mode, timeout = data
-        self.live_can_screen.start_monitor(can_id, mode, timeout)
+        try: can_filters = cf.parse_can_filters(can_id)
+        except ValueError as e:
+            self.log.error(f"Invalid CAN ID filter {can_id!r}: {e}")
+            self.statusBar().showMessage(f"Invalid CAN ID filter: {e}")
+            return
+        if can_filters: self.log.info(f"Receive filters: {can_filters}")
+        self.live_can_screen.start_monitor(can_filters, mode, timeout)
         self.stack.setCurrentWidget(self.live_can_screen)
 
     def run_replay_log(self, data):
-        file_path, logging_source, mode = data
-        can_log = cf.get_can_from_xlsx(file_path, logging_source)
-        cf.replay_can_bus(file_path, logging_source)
-        self.live_can_screen.start_replay(can_log, mode)
+        file_path, logging_source, log_date, mode, speed, profile = data
+        can_log = cf.get_can_from_xlsx(file_path, logging_source, log_date or None)
+        self.live_can_screen.start_replay(can_log, mode, cf.get_replay_speed(speed), profile == "cProfile")
         self.stack.setCurrentWidget(self.live_can_screen)
\ No newline at end of file
@@ -0,0 +1,195 @@
+import time
+import numpy as np
+import bin.formats.vars as vars
+from bin.lib.FRC_CAN_Lib import decoder, id_codec
+
+class Timer_Wheel:
+    def __init__(self, tick_ns: int, slots: int):
+        """
+        Hashed timer wheel: a deadline goes into slot (deadline // tick) % slots, so scheduling
+        and cancelling are O(1) and expiring only looks at the slots time has moved past.
+        """
+        self.tick_ns = tick_ns
+        self.slots = slots
+        self.wheel = [set() for _ in range(slots)]
+        self.slot_of = {}   # key -> slot
+        self.deadlines = {} # key -> deadline [ns]
+        self.tick = None    # first tick expire() looks at next
+        self.started = False
+
+    def __len__(self): return len(self.deadlines)
+
+    def schedule(self, key, deadline_ns: int):
+        self.cancel(key)
+        tick = deadline_ns // self.tick_ns
+        # Until the first expire() the wheel starts at the earliest deadline, so none is skipped
+        if self.tick is None or (not self.started and tick < self.tick): self.tick = tick
+        # A deadline already behind the wheel goes in the next slot expire() looks at, not a turn later
+        slot = max(tick, self.tick) % self.slots
+        self.wheel[slot].add(key)
+        self.slot_of[key] = slot
+        self.deadlines[key] = deadline_ns
+
+    def cancel(self, key):
+        slot = self.slot_of.pop(key, None)
+        if slot is None: return
+        self.wheel[slot].discard(key)
+        del self.deadlines[key]
+
+    def expire(self, now_ns: int):
+        # Keys whose deadline has passed; deadlines a full turn or more away stay in their slot
+        tick = now_ns // self.tick_ns
+        if self.tick is None: self.tick = tick
+        self.started = True
+        expired = []
+        for t in range(self.tick, min(tick, self.tick + self.slots - 1) + 1):
+            slot = self.wheel[t % self.slots]
+            for key in [key for key in slot if self.deadlines[key] <= now_ns]:
+                self.cancel(key)
+                expired.append(key)
+        self.tick = max(self.tick, tick)
+        return expired
+
+class API_Stream:
+    def __init__(self, frameid: int):
+        # One arbitration ID (device + API) and its arrival statistics
+        self.frameid = frameid
+        self.api = id_codec.get_api(frameid)
+        self.model = None
+        self.period_ns = None
+        self.period_source = None  # "yaml" or "learned"
+        self.learn_gaps = []
+
+        self.status = "Online"
+        self.frames = 0
+        self.last_ts_ns = None
+        self.jitter_sum_ns = 0
+        self.jitter_max_ns = 0
+        self.gaps = 0
+        self.missed = 0
+        self.late_events = 0
+
+    def add_gaps(self, gaps_ns):
+        if self.period_ns is None:
+            # No period in the library: learn it from the first inter-arrival gaps
+            self.learn_gaps.extend(gaps_ns.tolist())
+            if len(self.learn_gaps) < vars.liveness_learn_frames: return
+            self.period_ns = int(np.median(self.learn_gaps))
+            self.period_source = "learned"
+            self.learn_gaps = []
+            if self.period_ns <= 0: self.period_ns = None
+            return
+
+        jitter = np.abs(gaps_ns - self.period_ns)
+        self.jitter_sum_ns += int(jitter.sum())
+        self.jitter_max_ns = max(self.jitter_max_ns, int(jitter.max()))
+        self.gaps += len(gaps_ns)
+        self.missed += int(np.maximum(np.rint(gaps_ns / self.period_ns) - 1, 0).sum())
+
+    def get_jitter_ms(self): return self.jitter_sum_ns / self.gaps / 1e6 if self.gaps else 0.0
+
+    def get_stats(self):
+        return {"id": hex(self.frameid), "api": self.api, "status": self.status, "frames": self.frames,
+                "period_ms": self.period_ns / 1e6 if self.period_ns else None, "period_source": self.period_source,
+                "jitter_ms": round(self.get_jitter_ms(), 3), "max_jitter_ms": round(self.jitter_max_ns / 1e6, 3),
+                "missed": self.missed, "late_events": self.late_events}
+
+class Liveness_Tracker:
+    def __init__(self, cntrs):
+        """
+        Per-API liveness of live controllers. Every frame pushes its stream's deadline to
+        last arrival + liveness_late_periods periods; a stream whose deadline passes is Late,
+        and Offline after liveness_offline_periods. Controllers take the state of their streams.
+        """
+        self.cntrs = cntrs
+        self.streams = {}       # frameid -> API_Stream
+        self.cntr_streams = {}  # global key -> [API_Stream]
+        self.wheel = Timer_Wheel(round(vars.liveness_tick_ms * 1e6), vars.liveness_wheel_slots)
+        self.clock_offset_ns = None  # wall clock - frame clock, so tick() runs on the frames' time base
+
+    def update(self, ts_ns, frameids):
+        ts_ns, frameids = np.asarray(ts_ns), np.asarray(frameids, dtype=np.uint32)
+        valid = ~np.isin(id_codec.get_api_array(frameids), vars.bad_apis)
+        ts_ns, frameids = ts_ns[valid], frameids[valid]
+        if not len(frameids): return
+        self.clock_offset_ns = time.time_ns() - int(ts_ns.max())
+
+        # Group by arbitration ID, time order kept
+        order = np.lexsort((ts_ns, frameids))
+        frameids, ts_ns = frameids[order], ts_ns[order]
+        starts = np.flatnonzero(np.r_[True, frameids[1:] != frameids[:-1]])
+        ends = np.r_[starts[1:], len(frameids)]
+
+        changed = set()
+        for frameid, start, end in zip(frameids[starts].tolist(), starts.tolist(), ends.tolist()):
+            stream = self.get_stream(frameid)
+            arrivals = ts_ns[start:end]
+            if stream.last_ts_ns is not None: arrivals = np.r_[stream.last_ts_ns, arrivals]
+            if len(arrivals) > 1: stream.add_gaps(np.diff(arrivals))
+
+            stream.frames += end - start
+            stream.last_ts_ns = int(ts_ns[end - 1])
+            if stream.status != "Online":
+                stream.status = "Online"
+                changed.add(id_codec.get_global_key(frameid))
+            if stream.period_ns:
+                self.wheel.schedule(frameid, stream.last_ts_ns + vars.liveness_late_periods * stream.period_ns)
+
+        for key in changed: self.update_cntr(key)
+
+    def get_stream(self, frameid):
+        stream = self.streams.get(frameid)
+        if stream is None:
+            stream = self.streams[frameid] = API_Stream(frameid)
+            self.cntr_streams.setdefault(id_codec.get_global_key(frameid), []).append(stream)
+
+        # The library period follows the identified model, which can change as APIs show up
+        cntr = self.cntrs.get(id_codec.get_global_key(frameid))
+        model = cntr.get_model() if cntr else None
+        if model != stream.model:
+            stream.model = model
+            period_ms = decoder.get_period_ms(model, stream.api)
+            if period_ms:
+                stream.period_ns, stream.period_source = round(period_ms * 1e6), "yaml"
+        return stream
+
+    def tick(self, now_ns: int = None):
+        if now_ns is None:
+            if self.clock_offset_ns is None: return
+            now_ns = time.time_ns() - self.clock_offset_ns
+
+        changed = set()
+        for frameid in self.wheel.expire(now_ns):
+            stream = self.streams[frameid]
+            if stream.status == "Online":
+                stream.status = "Late"
+                stream.late_events += 1
+                # With coarse ticks the Offline deadline may already have passed too
+                offline_ns = stream.last_ts_ns + vars.liveness_offline_periods * stream.period_ns
+                if offline_ns <= now_ns: stream.status = "Offline"
+                else: self.wheel.schedule(frameid, offline_ns)
+            else:
+                stream.status = "Offline"
+            changed.add(id_codec.get_global_key(frameid))
+
+        for key in changed: self.update_cntr(key)
+
+    def update_cntr(self, key):
+        cntr = self.cntrs.get(key)
+        if cntr is None: return
+        statuses = [stream.status for stream in self.cntr_streams[key] if stream.period_ns]
+        if statuses and all(status == "Offline" for status in statuses): cntr.status = "Offline"
+        elif "Late" in statuses or "Offline" in statuses: cntr.status = "Late"
+        else: cntr.status = "Online"
+
+    def refresh_cntrs(self):
+        # Last seen, jitter and missed frames of each controller, from its streams
+        for key, streams in self.cntr_streams.items():
+            cntr = self.cntrs.get(key)
+            if cntr is None: continue
+            gaps = sum(stream.gaps for stream in streams)
+            cntr.last_seen = max(stream.last_ts_ns for stream in streams) / 1e9
+            cntr.latency = sum(stream.jitter_sum_ns for stream in streams) / gaps / 1e6 if gaps else 0.0
+            cntr.missed = sum(stream.missed for stream in streams)
+
+    def report(self): return [stream.get_stats() for stream in self.streams.values()]
@@ -0,0 +1,126 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+import bin.funcs.can_functions as cf
+from bin.lib.FRC_CAN_Lib import id_codec
+
+
+# ============================================================
+# Live frame model (Standard CAN view over the ring buffer)
+# ============================================================
+class Live_Frame_Model(QAbstractTableModel):
+    def __init__(self, frames, columns):
+        """
+        Table model over a Frame_Ring_Buffer. Rows are only formatted when the view asks
+        for them (i.e. when they are visible); sync() turns new frames into row signals.
+        """
+        super().__init__()
+        self.frames = frames
+        self.columns = columns
+
+        self.first_seq = 0  # sequence number of row 0
+        self.rows = 0
+        self.seen = 0       # frames.total at the last sync
+
+    # ---------------- Qt model interface ----------------
+    def rowCount(self, parent=QModelIndex()): return 0 if parent.isValid() else self.rows
+    def columnCount(self, parent=QModelIndex()): return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole: return QVariant()
+        if orientation == Qt.Horizontal: return self.columns[section]
+        return str(self.first_seq + section)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid(): return QVariant()
+
+        frame = self.frames.get(self.first_seq + index.row())
+        if frame is None: return ""  # overwritten since the last sync
+
+        ts_ns, frameid, data = frame
+        col = index.column()
+        if col == 0: return f"{ts_ns / 1e9:.6f}"
+        if col == 1: return hex(frameid)
+        if col - 2 < len(data): return f"{data[col - 2]:02X}"
+        return ""
+
+    # ---------------- Buffer sync ----------------
+    def sync(self):
+        total, length = self.frames.total, len(self.frames)
+        first_seq = total - length
+        if total == self.seen: return
+
+        # Cleared, or everything shown has been overwritten: start over
+        if total < self.seen or first_seq >= self.first_seq + self.rows:
+            self.beginResetModel()
+            self.first_seq, self.rows, self.seen = first_seq, length, total
+            self.endResetModel()
+            return
+
+        dropped = first_seq - self.first_seq
+        if dropped > 0:
+            self.beginRemoveRows(QModelIndex(), 0, dropped - 1)
+            self.first_seq = first_seq
+            self.rows -= dropped
+            self.endRemoveRows()
+
+        added = total - self.seen
+        if added > 0:
+            self.beginInsertRows(QModelIndex(), self.rows, self.rows + added - 1)
+            self.rows += added
+            self.seen = total
+            self.endInsertRows()
+
+
+# ============================================================
+# Latest value model (FRC view, one row per arbitration ID)
+# ============================================================
+class Latest_Value_Model(QAbstractTableModel):
+    def __init__(self, latest, columns):
+        """
+        Table model over a Latest_Value_Cache. sync() only signals new rows and the
+        cells whose value changed, so repaint work follows the number of IDs, not the frame rate.
+        """
+        super().__init__()
+        self.latest = latest
+        self.columns = columns
+        self.rows = 0
+
+    # ---------------- Qt model interface ----------------
+    def rowCount(self, parent=QModelIndex()): return 0 if parent.isValid() else self.rows
+    def columnCount(self, parent=QModelIndex()): return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole: return QVariant()
+        if orientation == Qt.Horizontal: return self.columns[section]
+        return str(section)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid(): return QVariant()
+
+        row, col = index.row(), index.column()
+        frameid = int(self.latest.frameids[row])
+        device_type, mfg, api, device_number = id_codec.decode_id(frameid)
+        if col == 0: return cf.get_device_type(device_type, "str")
+        if col == 1: return cf.get_mfg(mfg, "str")
+        if col == 2: return cf.get_id(device_number, "str")
+        if col == 3: return str(api)
+
+        byte = col - self.latest.static_cols
+        if byte < self.latest.dlcs[row]: return f"{self.latest.payloads[row, byte]:02X}"
+        return ""
+
+    # ---------------- Cache sync ----------------
+    def sync(self):
+        if len(self.latest) < self.rows:
+            self.beginResetModel()
+            self.rows = len(self.latest)
+            self.latest.take_dirty()
+            self.endResetModel()
+            return
+
+        if len(self.latest) > self.rows:
+            self.beginInsertRows(QModelIndex(), self.rows, len(self.latest) - 1)
+            self.rows = len(self.latest)
+            self.endInsertRows()
+
+        for row, first_col, last_col in self.latest.take_dirty():
+            self.dataChanged.emit(self.index(row, first_col), self.index(row, last_col), [Qt.DisplayRole])
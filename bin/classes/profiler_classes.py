@@ -0,0 +1,106 @@
+import json
+import time
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+import bin.formats.vars as vars
+import bin.funcs.global_functions as gf
+
+# Histogram bin b counts durations of b bits, i.e. in [2**(b-1), 2**b) ns; the last bin takes everything longer
+HIST_BINS = 40
+
+class Stage_Timer:
+    def __init__(self, name: str):
+        """
+        Call count, items, total/max time and a log2 histogram of one pipeline stage.
+        Adding a sample is a handful of integer ops, so stages are timed per batch on the hot path.
+        """
+        self.name = name
+        self.lock = threading.Lock()  # stages can be fed from the receiver, recorder, replay and GUI threads
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.calls = 0
+            self.items = 0
+            self.total_ns = 0
+            self.max_ns = 0
+            self.hist = [0] * HIST_BINS
+
+    def add(self, ns: int, items: int = 1):
+        with self.lock:
+            self.calls += 1
+            self.items += items
+            self.total_ns += ns
+            if ns > self.max_ns: self.max_ns = ns
+            self.hist[min(ns.bit_length(), HIST_BINS - 1)] += 1
+
+    def get_percentile_ns(self, p: float):
+        # Upper edge of the bin holding the p-th percentile (at most 2x high), capped at the max
+        target, seen = self.calls * p / 100, 0
+        for b, count in enumerate(self.hist):
+            seen += count
+            if count and seen >= target: return min(1 << b, self.max_ns)
+        return 0
+
+    def get_stats(self, elapsed_s: float):
+        with self.lock:
+            if not self.calls: return {"calls": 0}
+            return {"calls": self.calls, "items": self.items, "items_per_s": round(self.items / elapsed_s, 1),
+                    "busy_pct": round(100.0 * self.total_ns / 1e9 / elapsed_s, 2),
+                    "mean_ms": round(self.total_ns / self.calls / 1e6, 4),
+                    **{f"p{p}_ms": round(self.get_percentile_ns(p) / 1e6, 4) for p in vars.pipeline_percentiles},
+                    "max_ms": round(self.max_ns / 1e6, 4)}
+
+class Pipeline_Stats:
+    def __init__(self, stages: list = None):
+        # One Stage_Timer per stage; stages not in the list are added on first use
+        self.stages = {name: Stage_Timer(name) for name in stages or vars.pipeline_stages}
+        self.reset()
+
+    def reset(self):
+        for stage in self.stages.values(): stage.reset()
+        self.started_ns = time.perf_counter_ns()
+        self.logged_at = time.monotonic()
+
+    def get(self, stage: str):
+        timer = self.stages.get(stage)
+        if timer is None: timer = self.stages.setdefault(stage, Stage_Timer(stage))
+        return timer
+
+    def add(self, stage: str, ns: int, items: int = 1): self.get(stage).add(ns, items)
+
+    @contextmanager
+    def time(self, stage: str, items: int = 1):
+        start = time.perf_counter_ns()
+        try: yield
+        finally: self.get(stage).add(time.perf_counter_ns() - start, items)
+
+    def get_elapsed_s(self): return max(time.perf_counter_ns() - self.started_ns, 1) / 1e9
+
+    def get_stats(self):
+        elapsed_s = self.get_elapsed_s()
+        return {name: stage.get_stats(elapsed_s) for name, stage in list(self.stages.items())}
+
+    def get_status(self):
+        # One line for the status bar: rate and p99 of every stage that has run
+        parts = []
+        for name, stats in self.get_stats().items():
+            if not stats["calls"]: continue
+            parts.append(f"{name} {stats['items_per_s']:,.0f}/s p99 {stats['p99_ms']:.2f} ms")
+        return " | ".join(parts)
+
+    # ---------------- Log ----------------
+    def log_due(self): return time.monotonic() - self.logged_at >= vars.pipeline_log_s
+
+    def write_log(self, path: str = None):
+        # Appends one JSON line to output_files/logs/pipeline_stats.jsonl
+        path = path or f"{gf.get_output_dir('logs')}/{vars.pipeline_log_file}"
+        line = {"time": datetime.now().isoformat(timespec="seconds"), "elapsed_s": round(self.get_elapsed_s(), 3),
+                "stages": self.get_stats()}
+        with open(path, "a") as f: f.write(json.dumps(line) + "\n")
+        self.logged_at = time.monotonic()
+        return path
+
+# Shared by every part of the pipeline, like the startup marks in global_functions
+PIPELINE_STATS = Pipeline_Stats()
@@ -0,0 +1,136 @@
+import os
+import time
+import threading
+from collections import deque
+from datetime import datetime
+import numpy as np
+import bin.formats.vars as vars
+import bin.funcs.global_functions as gf
+from bin.classes.capture_classes import Capture_Writer, RECORD_DTYPE
+from bin.classes.profiler_classes import PIPELINE_STATS
+
+BYTE_HEX = [f"{b:02X}" for b in range(256)]
+DAY_MS = 86_400_000
+
+def format_gui_csv(batch):
+    # One string per block in the "GUI CSV Output" layout; timestamps are local time of day
+    ts_ns, frameids, payloads, dlcs = batch[:4]  # the layout has no frame format column
+    ts_ms = ts_ns // 1_000_000
+    midnight = datetime.fromtimestamp(ts_ms[0] / 1e3).replace(hour=0, minute=0, second=0, microsecond=0)
+    tod = (ts_ms - int(midnight.timestamp() * 1e3)) % DAY_MS
+    h, rem = np.divmod(tod, 3_600_000)
+    m, rem = np.divmod(rem, 60_000)
+    s, ms = np.divmod(rem, 1000)
+
+    lines = []
+    for h_, m_, s_, ms_, frameid, payload, dlc in zip(h.tolist(), m.tolist(), s.tolist(), ms.tolist(),
+                                                    frameids.tolist(), payloads.tolist(), dlcs.tolist()):
+        data = " ".join([BYTE_HEX[b] for b in payload[:dlc]])
+        lines.append(f"{h_:02d}:{m_:02d}:{s_:02d}.{ms_:03d},{hex(frameid)},{data}\n")
+    return "".join(lines)
+
+class CAN_Recorder(threading.Thread):
+    def __init__(self, queue, fmt: str["csv", "binary"] = None, out_dir: str = None,
+                 rotate_mb: float = None, rotate_s: float = None):
+        """
+        Writes every batch of a receiver consumer queue to disk on its own thread.
+
+        CSV files use the "GUI CSV Output" layout, binary files are capture files.
+        Files are rotated once they reach rotate_mb or are rotate_s old (0 disables either).
+        """
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.fmt = fmt or vars.record_format
+        if self.fmt not in ("csv", "binary"): raise ValueError(f"Unknown record format: {self.fmt}")
+        self.out_dir = out_dir or gf.get_output_dir("csv_logs" if self.fmt == "csv" else "capture_logs")
+        self.rotate_bytes = (vars.record_rotate_mb if rotate_mb is None else rotate_mb) * 1e6
+        self.rotate_s = vars.record_rotate_s if rotate_s is None else rotate_s
+
+        self.running = True
+        self.file = None
+        self.files = []
+        self.opened_at = 0.0
+        self.flushed_at = 0.0
+
+        self.frames_written = 0
+        self.blocks_written = 0
+        self.write_ms = deque(maxlen=vars.record_latency_samples)
+        self.max_write_ms = 0.0
+
+    # ---------------- Thread ----------------
+    def run(self):
+        try:
+            while self.running:
+                self.queue.wait(vars.rx_poll_timeout)
+                self.write_batches(self.queue.get_all())
+            self.write_batches(self.queue.get_all())  # whatever arrived before stop()
+        finally:
+            self.close_file()
+
+    def stop(self):
+        self.running = False
+        if self.is_alive(): self.join()
+
+    # ---------------- Writing ----------------
+    def write_batches(self, batches):
+        if batches:
+            batch = batches[0] if len(batches) == 1 else [np.concatenate(col) for col in zip(*batches)]
+            start = time.perf_counter_ns()
+
+            if self.file is None or self.rotation_due(): self.open_file()
+            if self.fmt == "csv": self.file.write(format_gui_csv(batch))
+            else: self.file.write(batch)
+
+            ns = time.perf_counter_ns() - start
+            PIPELINE_STATS.add("record", ns, len(batch[0]))
+            ms = ns / 1e6
+            self.write_ms.append(ms)
+            self.max_write_ms = max(self.max_write_ms, ms)
+            self.frames_written += len(batch[0])
+            self.blocks_written += 1
+
+        if self.file is not None and time.monotonic() - self.flushed_at >= vars.record_flush_s:
+            self.file.flush()
+            self.flushed_at = time.monotonic()
+
+    # ---------------- Files ----------------
+    def rotation_due(self):
+        if self.rotate_s and time.monotonic() - self.opened_at >= self.rotate_s: return True
+        return bool(self.rotate_bytes) and self.get_file_size() >= self.rotate_bytes
+
+    def get_file_size(self):
+        if self.fmt == "csv": return self.file.tell()
+        return self.file.f.tell() + self.file.pending_frames * RECORD_DTYPE.itemsize
+
+    def open_file(self):
+        self.close_file()
+        ext = ".csv" if self.fmt == "csv" else vars.capture_extension
+        name = f"live_can_{datetime.now():%Y-%m-%d_%H-%M-%S}"
+        path = os.path.join(self.out_dir, name + ext)
+        n = 1
+        while os.path.exists(path):
+            path = os.path.join(self.out_dir, f"{name}_{n}{ext}")
+            n += 1
+
+        if self.fmt == "csv":
+            self.file = open(path, "w", newline="")
+            self.file.write(",".join(vars.CANlogColumns["GUI CSV Output"]) + "\n")
+        else:
+            self.file = Capture_Writer(path)
+        self.files.append(path)
+        self.opened_at = self.flushed_at = time.monotonic()
+
+    def close_file(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    # ---------------- Stats ----------------
+    def get_stats(self):
+        stats = {"format": self.fmt, "files": len(self.files), "frames_written": self.frames_written,
+                 "blocks_written": self.blocks_written, "dropped": self.queue.dropped_frames,
+                 "queued": self.queue.frames, "max_write_ms": round(self.max_write_ms, 3)}
+        if self.write_ms:
+            write_ms = np.array(self.write_ms)
+            for p in (50, 99): stats[f"p{p}_write_ms"] = round(float(np.percentile(write_ms, p)), 3)
+        return stats
@@ -0,0 +1,147 @@
+import time
+import threading
+import numpy as np
+import bin.formats.vars as vars
+from bin.classes.profiler_classes import PIPELINE_STATS
+from bin.lib.FRC_CAN_Lib import id_codec
+
+class Replay_Cursor:
+    def __init__(self, can_log):
+        self.can_log = can_log
+
+        # Frames sorted by time, as one contiguous int64 ns array relative to the log start.
+        # Filled a chunk at a time so a memory-mapped log is never copied whole into temporaries
+        ts_ns, start_ns, chunk = can_log.ts_ns, can_log.ts_start_ns, vars.ingest_chunk_rows
+        ordered = True
+        for s in range(0, len(ts_ns), chunk):
+            part = ts_ns[s:s + chunk + 1]
+            if not np.all(part[1:] >= part[:-1]):
+                ordered = False
+                break
+        self.order = None if ordered else np.argsort(ts_ns, kind="stable")
+        self.rel_ts_ns = np.empty(len(ts_ns), dtype=np.int64)
+        for s in range(0, len(ts_ns), chunk):
+            rows = slice(s, s + chunk) if self.order is None else self.order[s:s + chunk]
+            self.rel_ts_ns[s:s + chunk] = ts_ns[rows] - start_ns
+
+        self.pos = 0
+        self.rel_ts = float("-inf")
+
+    def __len__(self): return len(self.rel_ts_ns)
+
+    def reset(self):
+        self.pos = 0
+        self.rel_ts = float("-inf")
+
+    def seek(self, rel_ts: float):
+        """
+        Moves the cursor so the next frame emitted is the first one at or after rel_ts (seconds).
+        """
+        self.pos = int(np.searchsorted(self.rel_ts_ns, round(rel_ts * 1e9), side="left"))
+        self.rel_ts = rel_ts
+
+    def advance(self, rel_ts: float):
+        """
+        Returns the log indices of every frame up to and including rel_ts (seconds)
+        that has not been emitted yet. Only the frames past the cursor are searched.
+        """
+        return self.advance_ns(round(rel_ts * 1e9))
+
+    def advance_ns(self, rel_ts_ns: int):
+        start = self.pos
+        end = start + int(np.searchsorted(self.rel_ts_ns[start:], rel_ts_ns, side="right"))
+        self.pos = end
+        self.rel_ts = max(self.rel_ts, rel_ts_ns / 1e9)
+
+        if self.order is None: return range(start, end)
+        return self.order[start:end]
+
+    def done(self): return self.pos >= len(self.rel_ts_ns)
+
+    def next_rel_ts(self):
+        if self.done(): return None
+        return self.rel_ts_ns[self.pos] / 1e9
+
+class Replay_Scheduler:
+    def __init__(self, can_log, send, speed: float | str = 1.0, idle=None):
+        if speed != "max" and not vars.replay_speed_min <= speed <= vars.replay_speed_max:
+            raise ValueError(f"Replay speed must be 'max' or between {vars.replay_speed_min}x and {vars.replay_speed_max}x: {speed}")
+
+        self.can_log = can_log
+        self.cursor = can_log.cursor
+        self.send = send
+        self.speed = speed
+        self.idle = idle
+
+        self.running = False
+        self.stopped = threading.Event()  # set by stop(), cuts a wait between frames short
+        self.sent = 0
+        self.start_ns = 0
+        self.end_ns = 0
+        self.lateness_ns = np.zeros(len(self.cursor), dtype=np.int64)
+
+    def deadline_ns(self, pos):
+        # Monotonic send deadline of the frame(s) at cursor position pos
+        return self.start_ns + (self.cursor.rel_ts_ns[pos] - self.cursor.rel_ts_ns[0]) / self.speed
+
+    def wait_until(self, deadline_ns):
+        # Coarse sleep (yielding to idle work) until close to the deadline, then spin on the monotonic clock.
+        # False if stop() was called meanwhile
+        while True:
+            remaining = deadline_ns - time.perf_counter_ns()
+            if remaining <= 0: return self.running
+            if remaining > vars.replay_spin_ns:
+                if self.idle: self.idle()
+                if self.stopped.wait(min(remaining - vars.replay_spin_ns, vars.can_ds * 1e9) / 1e9): return False
+            elif not self.running: return False
+
+    def get_msgs(self, idx):
+        # (frameids, datas, extended) of log rows idx, sliced from the columns
+        rows = slice(idx.start, idx.stop) if isinstance(idx, range) else idx
+        frameids = self.can_log.frameids[rows].tolist()
+        datas = [bytes(row[:dlc]) for row, dlc in zip(self.can_log.payloads[rows].tolist(), self.can_log.dlcs[rows].tolist())]
+        return frameids, datas, id_codec.is_extended_flags(self.can_log.flags[rows]).tolist()
+
+    def run(self):
+        cursor = self.cursor
+        cursor.reset()
+        self.running = not self.stopped.is_set()
+        self.sent = 0
+        self.start_ns = time.perf_counter_ns()
+
+        while self.running and not cursor.done():
+            pos = cursor.pos
+            if self.speed == "max":
+                idx = cursor.advance_ns(cursor.rel_ts_ns[pos])
+            else:
+                if not self.wait_until(self.deadline_ns(pos)): break
+                # Everything already due goes out together, late frames are never dropped
+                elapsed_ns = time.perf_counter_ns() - self.start_ns
+                idx = cursor.advance_ns(cursor.rel_ts_ns[0] + int(elapsed_ns * self.speed))
+
+            start = time.perf_counter_ns()
+            frameids, datas, extended = self.get_msgs(idx)
+            PIPELINE_STATS.add("convert", time.perf_counter_ns() - start, len(frameids))
+            self.send(frameids, datas, extended)
+            send_ns = time.perf_counter_ns()
+            if self.speed != "max":
+                self.lateness_ns[pos:cursor.pos] = send_ns - self.deadline_ns(np.arange(pos, cursor.pos))
+            self.sent = cursor.pos
+
+        self.end_ns = time.perf_counter_ns()
+        self.running = False
+
+    def stop(self):
+        self.running = False
+        self.stopped.set()
+
+    def report(self):
+        duration = max(self.end_ns - self.start_ns, 1) / 1e9
+        report = {"frames": self.sent, "speed": self.speed, "duration_s": round(duration, 3), "frames_per_s": round(self.sent / duration, 1)}
+        if self.speed == "max" or not self.sent: return report
+
+        jitter_ms = np.abs(self.lateness_ns[:self.sent]) / 1e6
+        for p in vars.replay_jitter_percentiles:
+            report[f"p{p}_ms"] = round(float(np.percentile(jitter_ms, p)), 3)
+        report["max_ms"] = round(float(jitter_ms.max()), 3)
+        return report
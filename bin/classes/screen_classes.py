@@ -1,6 +1,6 @@
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
-    QLineEdit, QComboBox, QFileDialog, QTableWidget,
+    QLineEdit, QComboBox, QFileDialog, QTableWidget, QTableView,
     QTableWidgetItem, QHeaderView
 )
 from PyQt5.QtCore import Qt
@@ -40,13 +40,14 @@ class InputScreen(QWidget):
                 widget.addItems(field["options"])
                 row.addWidget(widget)
 
-            elif ftype == "file":
-                file_label = QLabel("No file selected")
+            elif ftype in ("file", "folder"):
+                file_label = QLabel(f"No {ftype} selected")
                 file_label.setStyleSheet("color: #aaaaaa;")
 
                 browse_btn = QPushButton("Browse...")
+                pick = self.pick_file if ftype == "file" else self.pick_folder
                 browse_btn.clicked.connect(
-                    lambda _, lbl=file_label: self.pick_file(lbl)
+                    lambda _, lbl=file_label, pick=pick: pick(lbl)
                 )
 
                 row.addWidget(browse_btn)
@@ -78,6 +79,11 @@ class InputScreen(QWidget):
         if path:
             label_widget.setText(path)
 
+    def pick_folder(self, label_widget):
+        path = QFileDialog.getExistingDirectory(self, "Select Folder", "")
+        if path:
+            label_widget.setText(path)
+
 class NavigationScreen(QWidget):
     def __init__(self, main, config):
         super().__init__()
@@ -130,6 +136,11 @@ class PPResultsScreen(QWidget):
         title.setStyleSheet("font-size: 32px; font-weight: bold;")
         root.addWidget(title)
 
+        # Batch progress (files done / total)
+        self.status = QLabel("")
+        self.status.setAlignment(Qt.AlignCenter)
+        root.addWidget(self.status)
+
         # Table
         self.table = QTableWidget()
         self.table.setColumnCount(4)
@@ -159,19 +170,31 @@ class LiveCANScreen(QWidget):
         title.setStyleSheet("font-size: 28px; font-weight: bold;")
         root.addWidget(title)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels(["Timestamp", "ID", "Data"])
-        header = self.table.horizontalHeader()
-        header.setSectionResizeMode(QHeaderView.Stretch)
+        # Bus load over the last window, and its top talkers
+        self.bus_label = QLabel("")
+        self.bus_label.setAlignment(Qt.AlignCenter)
+        root.addWidget(self.bus_label)
+
+        # Virtualized view, rows come from a model over the frame buffer (Standard CAN) or the latest values (FRC)
+        self.table = QTableView()
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(24)
         root.addWidget(self.table)
 
         btn_row = QHBoxLayout()
         self.pause_btn = QPushButton("Pause")
+        self.tail_btn = QPushButton("Auto-scroll")
+        self.tail_btn.setCheckable(True)
+        self.tail_btn.setChecked(True)
+        self.record_btn = QPushButton("Record")
+        self.record_btn.setCheckable(True)
         self.clear_btn = QPushButton("Clear")
         self.back_btn = QPushButton("Back")
 
         btn_row.addWidget(self.pause_btn)
+        btn_row.addWidget(self.tail_btn)
+        btn_row.addWidget(self.record_btn)
         btn_row.addWidget(self.clear_btn)
         btn_row.addWidget(self.back_btn)
 
@@ -0,0 +1,54 @@
+import os
+from datetime import datetime, date, timedelta, time as dt_time
+import numpy as np
+import bin.formats.vars as vars
+import bin.funcs.global_functions as gf
+
+DAY_NS = 86_400_000_000_000
+
+class Timestamp_Parser:
+    def __init__(self, path: str = None, log_date: str | date = None, fmt: str = None):
+        """
+        Parses the timestamp column of one log into int64 epoch ns, chunk after chunk.
+
+        The format is detected on the first chunk and kept for the rest of the file. Time of day
+        stamps are anchored to local midnight of log_date ("YYYY-MM-DD"), else of the date in the
+        file name, else of the file's modification date; a stamp more than vars.ts_rollover_s
+        before the previous one is on the next day (and that far after it, on the day before).
+        Innomaker stamps count from the adapter start and are kept as they are.
+        """
+        self.path = path
+        self.fmt = fmt
+        self.date = self.get_anchor_date(log_date)
+        self.day = 0          # days past the anchor date
+        self.last_ns = None   # last time of day parsed
+
+    def get_anchor_date(self, log_date):
+        if isinstance(log_date, str) and log_date.strip(): return date.fromisoformat(log_date.strip())
+        if isinstance(log_date, date): return log_date
+        if self.path:
+            file_date = gf.get_file_date(self.path)
+            if file_date: return file_date
+            if os.path.exists(self.path): return datetime.fromtimestamp(os.path.getmtime(self.path)).date()
+        return date.today()
+
+    def get_midnight_ns(self, day: date):
+        # Local midnight as epoch ns
+        return round(datetime.combine(day, dt_time()).timestamp()) * 1_000_000_000
+
+    def parse(self, column):
+        if not len(column): return np.zeros(0, dtype=np.int64)
+        if self.fmt is None and column.dtype.kind not in "iuf": self.fmt = gf.detect_time_format(column.iloc[0])
+        ts_ns = gf.convert_time_array(column, "epoch_ns", self.fmt)
+
+        if self.fmt == "date_time":
+            # Wall clock -> epoch with the UTC offset of the first stamp's day
+            days = int(ts_ns[0] // DAY_NS)
+            return ts_ns + self.get_midnight_ns(date(1970, 1, 1) + timedelta(days=days)) - days * DAY_NS
+        if self.fmt != "time_of_day": return ts_ns
+
+        rollover_ns = round(vars.ts_rollover_s * 1e9)
+        steps = np.diff(ts_ns, prepend=ts_ns[0] if self.last_ns is None else self.last_ns)
+        days = self.day + np.cumsum((steps < -rollover_ns).astype(np.int64) - (steps > rollover_ns))
+        self.day, self.last_ns = int(days[-1]), int(ts_ns[-1])
+        return self.get_midnight_ns(self.date) + days * DAY_NS + ts_ns
@@ -26,6 +26,7 @@ GUI_CONFIG = {
         "home": {
             "buttons": [
                 {"label": "Post Process", "action": "go_pp"},
+                {"label": "Batch Process", "action": "go_pp_batch"},
                 {"label": "Real Time", "action": "go_rt"},
             ],
             "bottom_button": {"label": "Exit", "action": "exit"}
@@ -56,16 +57,30 @@ GUI_CONFIG = {
             "fields": [
                 {"type": "file", "label": "Select Log File"},
                 {"type": "dropdown", "label": "Logging Source",
-                 "options": ["Innomaker", "GUI CSV Output"]}
+                 "options": ["Innomaker", "GUI CSV Output", "FRC Capture"]},
+                {"type": "text", "label": "Log Date (YYYY-MM-DD, optional)"},
+                {"type": "dropdown", "label": "Profile", "options": ["Off", "cProfile"]}
             ],
             "run_action": "run_pp",
             "back_action": "go_home"
         },
 
+        "pp_batch_input": {
+            "title": "Process Log Folder",
+            "fields": [
+                {"type": "folder", "label": "Select Log Folder"},
+                {"type": "dropdown", "label": "Logging Source",
+                 "options": ["Auto", "Innomaker", "GUI CSV Output", "FRC Capture"]},
+                {"type": "dropdown", "label": "Profile", "options": ["Off", "cProfile"]}
+            ],
+            "run_action": "run_pp_batch",
+            "back_action": "go_home"
+        },
+
         "live_can_input": {
             "title": "Live CAN Settings",
             "fields": [
-                {"type": "text", "label": "CAN ID (optional)"},
+                {"type": "text", "label": "CAN ID Filter (optional, e.g. 0x2041401 or mfg=CTRE, num=1-4)"},
                 {"type": "dropdown", "label": "Mode", "options": ["Standard CAN", "FRC"]},
                 {"type": "text", "label": "Timeout (s)"}
             ],
@@ -78,8 +93,12 @@ GUI_CONFIG = {
             "fields": [
                 {"type": "file", "label": "Select Log File"},
                 {"type": "dropdown", "label": "Logging Source",
-                 "options": ["Innomaker", "GUI CSV Output"]},
-                {"type": "dropdown", "label": "Mode", "options": ["Standard CAN", "FRC"]}
+                 "options": ["Innomaker", "GUI CSV Output", "FRC Capture"]},
+                {"type": "text", "label": "Log Date (YYYY-MM-DD, optional)"},
+                {"type": "dropdown", "label": "Mode", "options": ["Standard CAN", "FRC"]},
+                {"type": "dropdown", "label": "Speed",
+                 "options": ["1x", "0.25x", "0.5x", "2x", "5x", "10x", "Max"]},
+                {"type": "dropdown", "label": "Profile", "options": ["Off", "cProfile"]}
             ],
             "run_action": "run_replay_log",
             "back_action": "go_rt"
@@ -94,7 +113,7 @@ GUI_CONFIG = {
             "Standard CAN": {
                 "columns": ["Timestamp", "ID","Byte0", "Byte1", "Byte2", "Byte3",
                     "Byte4", "Byte5", "Byte6", "Byte7"],
-                "count": 3
+                "count": 10
             },
             "FRC": {
                 "columns": [
@@ -1,9 +1,60 @@
 temp_can_data = can_data = [16448, 344321, 344326, 33095, 33031, 33032, 33033, 33034, 33035, 82188, 33036, 33037, 33038, 82191, 82192, 82193, 33044, 33045, 33054, 33055, 82208, 33064, 33065, 82218, 319]
-cntr_offline_debounce = 200
+liveness_tick_ms = 5
+liveness_wheel_slots = 512
+liveness_late_periods = 3
+liveness_offline_periods = 10
+liveness_learn_frames = 20
 can_baudrate = 1000000
 can_timeout = 1.0
 can_ds = 20/1000
-max_can_read = 20
+rx_batch_size = 512
+rx_queue_frames = 200_000
+rx_poll_timeout = 0.05
+tx_queue_frames = 100_000
+tx_send_timeout = 0.005
+tx_backoff_s = 0.001
+tx_max_attempts = 200
+tx_latency_samples = 4096
+can_max_frame_rate = 8000
+live_buffer_seconds = 60
+startup_budget_s = 2.0
+busload_window_s = 1.0
+busload_buckets = 10
+busload_top_n = 5
+interarrival_bins_ms = [0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000]
+replay_speed_min = 0.25
+replay_speed_max = 10.0
+replay_spin_ns = 2_000_000
+replay_jitter_percentiles = [50, 90, 99]
+capture_extension = ".frccan"
+capture_chunk_frames = 65536
+record_format = "csv"
+record_queue_frames = 1_000_000
+record_rotate_mb = 100
+record_rotate_s = 3600
+record_flush_s = 1.0
+record_latency_samples = 4096
 bad_apis = [2,992,993,994,995,996,996,997,998,999]
 innoMakerCANtool_interface = "gs_usb"
-CANlogColumns = {"Innomaker":["TimeStamp","FrameId","FrameData"],"GUI CSV Output":["timestamp","id","data"]}
\ No newline at end of file
+software_filter_interfaces = ["gs_usb", "virtual"]  # no driver/hardware filtering: receive filters are applied per batch instead
+log_file_sources = {".xls": "Innomaker", ".xlsx": "Innomaker", ".csv": "GUI CSV Output", capture_extension: "FRC Capture"}
+pp_workers = None
+ingest_chunk_rows = 200_000
+ts_rollover_s = 43200
+bench_sizes = [10_000, 1_000_000, 10_000_000]
+bench_devices = 16
+bench_device_mix = {"TalonFX": 8, "SparkMAX": 4, "Pigeon2": 1, "PDH": 1, "PneumaticHub": 1, "CANivore": 1}
+bench_default_period_ms = 20
+bench_jitter = 0.02
+bench_repeats = 3
+bench_sample_frames = 10_000
+pipeline_stages = ["receive", "convert", "lookup", "identify", "analyze", "decode", "record", "transmit", "render"]
+pipeline_percentiles = [50, 99]
+pipeline_status_ms = 1000
+pipeline_log_s = 30
+pipeline_log_file = "pipeline_stats.jsonl"
+profile_jobs = False
+profile_top_n = 40
+CANlogColumns = {"Innomaker":["TimeStamp","FrameId","FrameData"],"GUI CSV Output":["timestamp","id","data"]}
+CANlogFormatColumn = {"Innomaker":"FrameFormat"}  # logs without one fall back to the ID width
+extended_frame_format = "Extend Frame"
@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+from datetime import datetime
+import numpy as np
+import bin.formats.vars as vars
+import bin.formats.tables as tables
+import bin.funcs.global_functions as gf
+import bin.funcs.can_functions as cf
+import bin.classes.can_classes as cc
+from bin.classes.replay_classes import Replay_Scheduler
+from bin.classes.recorder_classes import format_gui_csv, BYTE_HEX
+from bin.lib.FRC_CAN_Lib.device_library import load_library
+from bin.lib.FRC_CAN_Lib.device_identifier import identify_device
+from bin.lib.FRC_CAN_Lib import decoder, id_codec
+
+# YAML device_type -> FRC device type number
+DEVICE_TYPE_IDS = {"Controller": 1, "MotorController": 2, "IMU": 4, "PowerDistribution": 8, "Pneumatics": 9, "Bridge": 10}
+MFG_IDS = {name: mfg for mfg, name in tables.mfg_lookup.items() if name != "Reserved"}
+
+# ------------------------------------------------------------
+# Synthetic FRC bus
+# ------------------------------------------------------------
+def get_bench_devices(n_devices: int = None):
+    """
+    [(name, frameid base, {api: period_ms})] for n devices following vars.bench_device_mix,
+    numbered from 1 per device type and manufacturer. APIs are each YAML's always_used ones
+    outside vars.bad_apis.
+    """
+    n_devices = n_devices or vars.bench_devices
+    library = {data["device"]["name"]: data for data in load_library() if "device" in data and "api_usage" in data}
+    mix = [name for name, weight in vars.bench_device_mix.items() if name in library for _ in range(weight)]
+
+    devices, numbers = [], {}
+    for i in range(n_devices):
+        data = library[mix[i % len(mix)]]
+        name = data["device"]["name"]
+        # Numbered per (device type, manufacturer): models sharing both would otherwise share IDs
+        key = (DEVICE_TYPE_IDS.get(data["device"]["device_type"], 10), MFG_IDS[data["device"]["manufacturer"]])
+        numbers[key] = numbers.get(key, 0) + 1
+        base = id_codec.encode_id(key[0], key[1], 0, numbers[key])
+
+        periods = {}
+        for api in data["api_usage"].get("always_used") or []:
+            if api in vars.bad_apis: continue
+            periods[api] = decoder.get_period_ms(name, api) or vars.bench_default_period_ms
+        devices.append((name, base, periods))
+    return devices
+
+def generate_frc_log(n_frames: int, n_devices: int = None, seed: int = 0, start_s: float = None):
+    """
+    Columnar can_data [ts_ns, frameids, payloads, dlcs, flags] of n_frames of periodic FRC traffic:
+    every device API at its period (with jitter and a random phase), time ordered.
+    """
+    rng = np.random.default_rng(seed)
+    streams = [(base | id_codec.encode_id(0, 0, api, 0), period_ms) for name, base, periods in get_bench_devices(n_devices) for api, period_ms in periods.items()]
+    rate = sum(1000.0 / period_ms for _, period_ms in streams)
+    duration_ns = int(n_frames / rate * 1e9) + 1
+    start_ns = int((start_s if start_s is not None else time.time()) * 1e9)
+
+    ts_parts, id_parts = [], []
+    for frameid, period_ms in streams:
+        period_ns = int(period_ms * 1e6)
+        count = duration_ns // period_ns + 1
+        ts = rng.integers(0, period_ns, dtype=np.int64) + np.arange(count, dtype=np.int64) * period_ns
+        ts += rng.normal(0, period_ns * vars.bench_jitter, count).astype(np.int64)
+        ts_parts.append(ts)
+        id_parts.append(np.full(count, frameid, dtype=np.uint32))
+
+    ts_ns, frameids = np.concatenate(ts_parts), np.concatenate(id_parts)
+    order = np.argsort(ts_ns, kind="stable")[:n_frames]
+    ts_ns, frameids = ts_ns[order] + start_ns, frameids[order]
+    payloads = rng.integers(0, 256, size=(len(ts_ns), 8), dtype=np.uint8)
+    return [ts_ns, frameids, payloads, np.full(len(ts_ns), 8, dtype=np.uint8), id_codec.get_flags_array(frameids)]
+
+# ------------------------------------------------------------
+# Log writers (Innomaker and GUI CSV layouts)
+# ------------------------------------------------------------
+def format_innomaker_csv(batch, first_seq: int = 0):
+    ts_ns, frameids, payloads, dlcs, flags = batch
+    us = ts_ns // 1000
+    formats = np.where(id_codec.is_extended_flags(flags), "Extend Frame", "Standard Frame").tolist()
+    lines = []
+    for i, (t, frameid, payload, dlc, fmt) in enumerate(zip(us.tolist(), frameids.tolist(), payloads.tolist(), dlcs.tolist(), formats)):
+        data = " ".join([BYTE_HEX[b] for b in payload[:dlc]])
+        lines.append(f"{first_seq + i},{t // 1_000_000}.{t // 1000 % 1000:03d}.{t % 1000:03d},0,Recv,0x{frameid:X},"
+                     f"Data Frame,{fmt},{dlc},0X|{data},Success\n")
+    return "".join(lines)
+
+def write_log(can_data, path: str, logging_source: str["Innomaker", "GUI CSV Output"]):
+    # Innomaker layout is written as CSV (its export format), spreadsheets top out near 1M rows
+    chunk = vars.ingest_chunk_rows
+    with open(path, "w", newline="") as f:
+        if logging_source == "Innomaker":
+            f.write("SeqID,TimeStamp,Channel,Direction,FrameId,FrameType,FrameFormat,Length,FrameData,Message\n")
+        else:
+            f.write(",".join(vars.CANlogColumns[logging_source]) + "\n")
+        for start in range(0, len(can_data[0]), chunk):
+            batch = [col[start:start + chunk] for col in can_data]
+            f.write(format_innomaker_csv(batch, start) if logging_source == "Innomaker" else format_gui_csv(batch))
+    return path
+
+# ------------------------------------------------------------
+# Benchmarks
+# ------------------------------------------------------------
+def time_it(func, repeats: int = 1):
+    # Best of repeats, in seconds, and the last result
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        t = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t)
+    return best, result
+
+def bench_size(n_frames: int, work_dir: str, log):
+    repeats = vars.bench_repeats if n_frames <= 100_000 else 1
+    results = {}
+    def record(name, func, frames=n_frames):  # frames: items processed (controllers for table stages)
+        seconds, result = time_it(func, repeats)
+        results[name] = {"s": round(seconds, 6), "per_s": round(frames / seconds, 1) if seconds else None}
+        log(f"  {name}: {seconds:.4f} s")
+        return result
+
+    can_data = record("generate", lambda: generate_frc_log(n_frames))
+
+    # Ingestion of both text layouts, whole file and streamed
+    for source, tag in (("GUI CSV Output", "gui_csv"), ("Innomaker", "innomaker")):
+        path = os.path.join(work_dir, f"bench_{n_frames}_{tag}.csv")
+        record(f"write_{tag}", lambda: write_log(can_data, path, source))
+        record(f"ingest_{tag}", lambda: cf.read_can_data(path, source))
+        record(f"stream_{tag}", lambda: cf.stream_can_log(path, source))
+        os.remove(path)
+
+    # Controller table
+    def open_log():
+        can_log = cc.CAN_log(can_data, "GUI CSV Output")
+        can_log.cntrs, can_log.cursor  # built on first use
+        return can_log
+    can_log = record("can_log", open_log)
+    record("registry_update", lambda: cc.Controller_Registry(can_log).update(can_log.ts_ns, can_log.frameids))
+    record("cntr_table", lambda: can_log.get_cntr_table(), len(can_log.cntrs))
+
+    # Identification of every controller, bypassing the model cache
+    def identify():
+        for cntr in can_log.cntrs: identify_device(cntr)
+    record("identify", identify, len(can_log.cntrs))
+
+    # Decoding: batch per arbitration ID, and the per-frame path on a sample
+    def decode_all():
+        for frameid in np.unique(can_log.frameids).tolist(): can_log.get_signals(frameid)
+    record("decode_batch", decode_all)
+
+    sample = min(n_frames, vars.bench_sample_frames)
+    def decode_frames():
+        for i in range(sample):
+            frameid = int(can_log.frameids[i])
+            cntr = can_log.cntrs.get(id_codec.get_global_key(frameid))
+            if cntr: decoder.decode_frameid(cntr.get_model(), frameid, can_log.payloads[i, :can_log.dlcs[i]].tobytes())
+    record("decode_frame", decode_frames, sample)
+    record("can_frame", lambda: [can_log.get_frame(i) for i in range(sample)], sample)
+
+    # Replay: scheduler at max speed into a no-op sink, and cursor stepping at the GUI tick
+    record("replay_max", lambda: Replay_Scheduler(can_log, lambda frameids, datas, extended: None, "max").run())
+    def step_cursor():
+        cursor = can_log.cursor
+        cursor.reset()
+        step_ns = round(vars.can_ds * 1e9)
+        t = 0
+        while not cursor.done():
+            t += step_ns
+            cursor.advance_ns(t)
+    record("replay_cursor", step_cursor)
+    return results
+
+def get_bench_meta():
+    try: commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip()
+    except OSError: commit = None
+    return {"time": datetime.now().isoformat(timespec="seconds"), "commit": commit, "python": sys.version.split()[0],
+            "numpy": np.__version__, "platform": platform.platform(), "cpus": os.cpu_count(),
+            "devices": vars.bench_devices}
+
+def run_benchmarks(sizes: list = None, out_path: str = None):
+    """
+    Times every stage at each size and writes {"meta", "results": {size: {stage: {s, per_s}}}}
+    as JSON under output_files/benchmarks. Returns the output path.
+    """
+    sizes = sizes or vars.bench_sizes
+    out_dir = gf.get_output_dir("benchmarks")
+    out_path = out_path or os.path.join(out_dir, f"bench_{datetime.now():%Y-%m-%d_%H-%M-%S}.json")
+
+    report = {"meta": get_bench_meta(), "results": {}}
+    for n_frames in sizes:
+        print(f"=== {n_frames} frames ===")
+        report["results"][str(n_frames)] = bench_size(n_frames, out_dir, print)
+        with open(out_path, "w") as f: json.dump(report, f, indent=2)  # keep what finished if a big size fails
+    return out_path
+
+def compare_benchmarks(old_path: str, new_path: str):
+    # Prints new / old time of every stage both runs have; < 1 is faster
+    with open(old_path) as f: old = json.load(f)["results"]
+    with open(new_path) as f: new = json.load(f)["results"]
+
+    ratios = {}
+    for size in new:
+        for stage, result in new[size].items():
+            before = old.get(size, {}).get(stage)
+            if not before or not before["s"]: continue
+            ratios[f"{size}/{stage}"] = round(result["s"] / before["s"], 3)
+            print(f"{size:>10} {stage:<16} {before['s']:>10.4f} s -> {result['s']:>10.4f} s  x{ratios[f'{size}/{stage}']}")
+    return ratios
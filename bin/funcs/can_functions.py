@@ -1,55 +1,266 @@
-import pandas as pd
+import os
+import time
+import numpy as np
 import bin.classes.can_classes as cc
 import bin.funcs.global_functions as gf
 import bin.formats.vars as vars
 import bin.formats.tables as tables
+from bin.classes.replay_classes import Replay_Scheduler
+from bin.classes.capture_classes import Capture_Writer, Capture_Reader
+from bin.classes.analytics_classes import Bus_Load_Analyzer
+from bin.classes.profiler_classes import PIPELINE_STATS
+from bin.classes.timestamp_classes import Timestamp_Parser
+from bin.lib.FRC_CAN_Lib import id_codec
 
-def get_can_from_xlsx(filename: str, logging_source: str["Innomaker", "GUI CSV Output"]):
+# ASCII code -> hex nibble value, used to parse whole columns of hex strings at once
+HEX_LUT = np.zeros(256, dtype=np.uint8)
+for i, c in enumerate("0123456789ABCDEF"):
+    HEX_LUT[ord(c)] = HEX_LUT[ord(c.lower())] = i
+
+def get_can_from_xlsx(filename: str, logging_source: str["Innomaker", "GUI CSV Output", "FRC Capture"], log_date: str = None):
 
     #Find file path
     path = gf.find_file_path(filename)
 
-    #Read file into pandas dataframe
-    if logging_source == "Innomaker": file_pd = pd.read_excel(path)
-    elif logging_source == "GUI CSV Output": file_pd = pd.read_csv(path)
-    else: raise ValueError(f"Unknown logging source: {logging_source}")
+    #Capture files are memory-mapped, the columns are views into the file
+    if logging_source == "FRC Capture": return cc.CAN_log(Capture_Reader(path).get_can_data(), logging_source)
+
+    return cc.CAN_log(read_can_data(path, logging_source, log_date), logging_source)
+
+def read_can_data(path: str, logging_source: str["Innomaker", "GUI CSV Output"], log_date: str = None):
+
+    #Read file into pandas dataframe (pandas is only imported when a log is opened)
+    import pandas as pd
+    if logging_source not in vars.CANlogColumns: raise ValueError(f"Unknown logging source: {logging_source}")
+    if path.lower().endswith(".csv"): file_pd = pd.read_csv(path)  #GUI CSV, or an Innomaker log exported as CSV
+    else: file_pd = pd.read_excel(path)
+
+    return convert_can_frame(file_pd, logging_source, Timestamp_Parser(path, log_date))
+
+def convert_can_frame(file_pd, logging_source: str["Innomaker", "GUI CSV Output"], parser: Timestamp_Parser = None):
+    #Extract CAN data as columns: ts [ns], frameid, (N, 8) payload, dlc, flags
+    #parser: the file's timestamp parser, kept across chunks (format, date, midnight rollover)
+    ts_col, id_col, data_col = vars.CANlogColumns[logging_source]
+    format_col = vars.CANlogFormatColumn.get(logging_source)
+    parser = parser or Timestamp_Parser()
+    with PIPELINE_STATS.time("convert", len(file_pd)):
+        payloads, dlcs = convert_data_array(file_pd[data_col])
+        frameids = convert_frameid_array(file_pd[id_col])
+        if format_col in file_pd: flags = convert_format_array(file_pd[format_col])
+        else: flags = id_codec.get_flags_array(frameids)
+        return [parser.parse(file_pd[ts_col]), frameids, payloads, dlcs, flags]
+
+def is_xlsx_file(path: str):
+    #xlsx workbooks are zip archives, whatever their extension
+    with open(path, "rb") as f: return f.read(4) == b"PK\x03\x04"
+
+def get_log_columns(logging_source: str):
+    #Columns read from a log: the layout's, plus the frame format column when the file has one
+    columns = vars.CANlogColumns[logging_source]
+    format_col = vars.CANlogFormatColumn.get(logging_source)
+    return lambda c: c in columns or c == format_col
+
+def read_can_chunks(path: str, logging_source: str["Innomaker", "GUI CSV Output", "FRC Capture"], chunk_rows: int = None,
+                    log_date: str = None):
+    """
+    Parse stage: yields the log as ([ts_ns, frameids, payloads, dlcs, flags], fraction done) chunks
+    of at most chunk_rows frames, so only one chunk is in memory at a time.
+    """
+    chunk_rows = chunk_rows or vars.ingest_chunk_rows
+    if logging_source == "FRC Capture":
+        reader = Capture_Reader(path)
+        for start in range(0, len(reader), chunk_rows):
+            records = reader.records[start:start + chunk_rows]
+            yield [np.array(col) for col in reader.get_can_data(records)], (start + len(records)) / len(reader)
+        return
+
+    import pandas as pd
+    usecols = get_log_columns(logging_source)
+    ext = os.path.splitext(path)[1].lower()
+    parser = Timestamp_Parser(path, log_date)
+
+    if ext == ".csv":
+        size = max(os.path.getsize(path), 1)
+        with open(path, "rb") as f:
+            for file_pd in pd.read_csv(f, usecols=usecols, dtype=str, chunksize=chunk_rows):
+                yield convert_can_frame(file_pd, logging_source, parser), min(f.tell() / size, 1.0)
+
+    elif is_xlsx_file(path):
+        #Rows are streamed from the sheet, never loading the whole workbook. Innomaker's .xls logs are
+        #xlsx content, so the file is opened by handle (openpyxl rejects the .xls extension)
+        import openpyxl
+        size = max(os.path.getsize(path), 1)
+        with open(path, "rb") as f:
+            book = openpyxl.load_workbook(f, read_only=True)
+            try:
+                #Logger workbooks can declare a stale A1 dimension, which would cut iteration short
+                sheet = book.active
+                sheet.reset_dimensions()
+                rows = sheet.iter_rows(values_only=True)
+                header = list(next(rows))
+                columns = [c for c in header if c is not None and usecols(c)]
+                cols = [header.index(c) for c in columns]
+
+                #Progress is the compressed position in the file, sheets often carry no row count
+                chunk = []
+                for row in rows:
+                    chunk.append([row[c] for c in cols])
+                    if len(chunk) == chunk_rows:
+                        yield convert_can_frame(pd.DataFrame(chunk, columns=columns, dtype=str), logging_source, parser), min(f.tell() / size, 1.0)
+                        chunk = []
+                if chunk: yield convert_can_frame(pd.DataFrame(chunk, columns=columns, dtype=str), logging_source, parser), 1.0
+            finally:
+                book.close()
+
+    else:
+        #Real BIFF .xls has no row streaming, only the needed columns are kept and converted per chunk
+        file_pd = pd.read_excel(path, usecols=usecols, dtype=str)
+        for start in range(0, len(file_pd), chunk_rows):
+            end = min(start + chunk_rows, len(file_pd))
+            yield convert_can_frame(file_pd.iloc[start:end], logging_source, parser), end / len(file_pd)
+
+def split_can_chunks(chunks):
+    #Split stage: keeps only what the controller table needs (ts, frame id) of frames with a valid API
+    for can_data, fraction in chunks:
+        ts_ns, frameids = can_data[0], can_data[1]
+        valid = ~np.isin(id_codec.get_api_array(frameids), vars.bad_apis)
+        yield ts_ns[valid], frameids[valid], len(frameids), fraction
+
+def stream_can_log(filename: str, logging_source: str["Innomaker", "GUI CSV Output", "FRC Capture"], progress=None,
+                   log_date: str = None):
+    """
+    Builds the controller table of a log chunk by chunk (parse -> split ID -> update controllers)
+    without holding the log in memory. progress(fraction, frames) is called after every chunk.
+    """
+    path = gf.find_file_path(filename)
+    can_stream = cc.CAN_Log_Stream(logging_source)
+    for ts_ns, frameids, frames, fraction in split_can_chunks(read_can_chunks(path, logging_source, log_date=log_date)):
+        can_stream.update(ts_ns, frameids, frames)
+        if progress: progress(fraction, can_stream.frames)
+    return can_stream
+
+def convert_to_capture(filename: str, logging_source: str["Innomaker", "GUI CSV Output"], out_path: str = None,
+                       log_date: str = None):
+    #Innomaker / GUI CSV log -> capture file (next to the input by default), returns its path
+    path = gf.find_file_path(filename)
+    out_path = out_path or os.path.splitext(path)[0] + vars.capture_extension
 
-    #Extract CAN data
-    can_data = file_pd[vars.CANlogColumns[logging_source]].values.tolist()
-    return cc.CAN_log(can_data, logging_source)
+    can_data = read_can_data(path, logging_source, log_date)
+    with Capture_Writer(out_path) as writer: writer.write(can_data)
+    return out_path
 
-def get_can_table(filename: str, logging_source: str):
-    can_log = get_can_from_xlsx(filename, logging_source)
-    table = can_log.get_cntr_table()
+def get_can_table(filename: str, logging_source: str, profile: bool = None):
+    progress = lambda fraction, frames: print(f"\r{fraction:6.1%} {frames} frames", end="", flush=True)
+    table = gf.profile_job("pp", stream_can_log, filename, logging_source, progress, profile=profile).get_cntr_table()
     print("\n=== Controller Table ===")
     for row in table:
         print(row)
     print("========================\n")
 
-def replay_can_bus(filename: str, logging_source: str):
-    running = True
-    can_log = get_can_from_xlsx(filename, logging_source)
-
-    start_time = gf.get_time("epoch")
-    prev_time = start_time
+def get_logging_source(path: str):
+    return vars.log_file_sources.get(os.path.splitext(path)[1].lower())
+
+def find_log_files(directory: str, logging_source: str = None):
+    #Every log in the directory (not recursive) whose extension matches the source, or any known log.
+    #Paths are absolute: find_file_path only searches by file name otherwise
+    directory = os.path.abspath(directory)
+    paths = []
+    for file in sorted(os.listdir(directory)):
+        source = get_logging_source(file)
+        if source and logging_source in (None, source): paths.append(os.path.join(directory, file))
+    return paths
+
+def process_log_file(path: str, logging_source: str = None, profile: bool = None):
+    #Runs in a worker process, so it only returns plain data (and takes the profile switch as an argument)
+    can_stream = gf.profile_job(f"pp_{os.path.basename(path)}", stream_can_log, path,
+                                logging_source or get_logging_source(path), profile=profile)
+    return {"file": os.path.basename(path), "frames": can_stream.frames, "table": can_stream.get_cntr_table()}
+
+def process_log_dir(directory: str, logging_source: str = None, workers: int = None, profile: bool = None):
+    """
+    Controller tables of every log in a directory, built across a process pool.
+    Results are yielded as each file finishes; a failed file yields {"file", "error"}.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    paths = find_log_files(directory, logging_source)
+    with ProcessPoolExecutor(max_workers=workers or vars.pp_workers) as pool:
+        profile = vars.profile_jobs if profile is None else profile
+        futures = {pool.submit(process_log_file, path, logging_source, profile): path for path in paths}
+        for future in as_completed(futures):
+            try: yield future.result()
+            except Exception as e: yield {"file": os.path.basename(futures[future]), "error": f"{type(e).__name__}: {e}"}
+
+def merge_cntr_table(inventory: dict, result: dict):
+    #inventory: (model, mfg, id) -> {"apis": set, "files": [...]}
+    for model, mfg, id, apis in result.get("table", []):
+        entry = inventory.setdefault((model, mfg, id), {"apis": set(), "files": []})
+        entry["apis"].update(apis)
+        entry["files"].append(result["file"])
+    return inventory
+
+def get_inventory_table(inventory: dict):
+    table = []
+    for (model, mfg, id), entry in sorted(inventory.items(), key=lambda item: [str(v) for v in item[0]]):
+        table.append([model, mfg, id, sorted(entry["apis"]), sorted(entry["files"])])
+    return table
+
+def get_dir_inventory(directory: str, logging_source: str = None):
+    inventory = {}
+    for result in process_log_dir(directory, logging_source):
+        if "error" in result: print(f"{result['file']}: {result['error']}")
+        else: print(f"{result['file']}: {result['frames']} frames, {len(result['table'])} controllers")
+        merge_cntr_table(inventory, result)
+
+    print("\n=== Device Inventory ===")
+    for row in get_inventory_table(inventory):
+        print(row)
+    print("========================\n")
+    return inventory
 
+def get_bus_load_report(filename: str, logging_source: str):
+    #Bus load of a whole log, fed chunk by chunk
+    path = gf.find_file_path(filename)
+    bus_load = Bus_Load_Analyzer()
+    for can_data, fraction in read_can_chunks(path, logging_source): bus_load.update(can_data)
+
+    report = bus_load.report()
+    print("\n=== Bus Load Report ===")
+    for key, value in report.items():
+        if key != "top_talkers": print(f"{key}: {value}")
+    for talker in report["top_talkers"]:
+        print(f"  {talker['id']}: {talker['fps']} fps, {talker['load_pct']}%")
+    print("=======================\n")
+    return report
+
+def replay_can_bus(filename: str, logging_source: str, speed: float | str = 1.0, profile: bool = None):
+    can_log = get_can_from_xlsx(filename, logging_source)
     live_can_system = cc.Live_CAN_System()
+    scheduler = Replay_Scheduler(can_log, live_can_system.send_can_msgs, speed, idle=live_can_system.read_can_msgs)
 
     try:
-        while running:
-            msgs = can_log.get_msgs(start_time, prev_time)
-            live_can_system.send_can_msgs(msgs)
-            live_can_system.read_can_msgs()
-
-            if gf.get_time("epoch") - start_time > can_log.ts_end:
-                running = False
-
-            prev_time = gf.get_time("epoch")
-            gf.wait(vars.can_ds)
+        gf.profile_job("replay", scheduler.run, profile=profile)
 
     except KeyboardInterrupt:
+        scheduler.stop()
+
+    finally:
         live_can_system.end_live_CAN_system()
 
+    print("\n=== Replay Report ===")
+    for key, value in scheduler.report().items():
+        print(f"{key}: {value}")
+    for key, value in live_can_system.cb.get_tx_stats().items():
+        if key != "ids": print(f"tx_{key}: {value}")
+    print("=====================\n")
+    return scheduler.report()
+
+def get_replay_speed(speed: str):
+    # "2x" -> 2.0, "Max" -> "max"
+    speed = speed.strip().lower()
+    if speed == "max": return "max"
+    return float(speed.removesuffix("x"))
+
 def read_can_bus():
     running = True
     start_time = gf.get_time("epoch")
@@ -65,18 +276,72 @@ def read_can_bus():
         live_can_system.end_live_CAN_system()
 
 def get_frameid_info(frameid: int | str):
-
-    if isinstance(frameid, int): id_val = frameid
-    elif frameid.startswith("0x"): id_val = int(frameid[2:], 16)
-    else: id_val = int(frameid)
-    id_bits = format(id_val, "029b")
-
-    device_type = int(id_bits[0:5], 2)
-    mfg = int(id_bits[5:13], 2)
-    api = int(id_bits[13:23], 2)
-    device_number = int(id_bits[23:29], 2)
-    global_id = [device_type, mfg, device_number]
-    return [global_id, api]
+    device_type, mfg, api, device_number = id_codec.decode_id(id_codec.parse_id(frameid))
+    return [[device_type, mfg, device_number], api]
+
+# ------------------------------------------------------------
+# Receive filters
+# ------------------------------------------------------------
+FILTER_FIELDS = {"type": tables.device_types_lookup, "mfg": tables.mfg_lookup, "api": None, "num": None}
+
+def get_filter_value(key: str, value: str):
+    # Number, or a device type/manufacturer name from tables
+    names = FILTER_FIELDS[key]
+    if names and not value[:1].isdigit():
+        for number, name in names.items():
+            if name.lower() == value.lower() and name != "Reserved": return number
+        raise ValueError(f"Unknown {key} name: {value}")
+    return id_codec.parse_id(value)
+
+def parse_can_filters(text: str):
+    """
+    python-can can_filters from the Live CAN "CAN ID" field, None when it is empty.
+
+    Filters are separated by ";" and a frame passes if it matches any of them. Within a filter,
+    comma separated fields are either frame ids ("0x2041401", "0x2040000/0x1FFF0000" for id/mask,
+    each its own filter) or FRC fields ANDed together: type=, mfg= (number or name from tables),
+    api= and num= (a number or a first-last range), e.g. "type=Motor Controller, mfg=CTRE, num=1-4".
+    Raises ValueError on anything else.
+    """
+    if not text or not text.strip(): return None
+    can_filters = []
+    for group in text.split(";"):
+        fields = {}
+        for part in group.split(","):
+            part = part.strip()
+            if not part: continue
+            if "=" in part:
+                key, value = (s.strip() for s in part.split("=", 1))
+                key = key.lower()
+                if key not in FILTER_FIELDS: raise ValueError(f"Unknown filter field: {key} (use {', '.join(FILTER_FIELDS)})")
+                if key == "num":
+                    first, _, last = value.partition("-")
+                    fields[key] = (id_codec.parse_id(first), id_codec.parse_id(last or first))
+                else: fields[key] = get_filter_value(key, value)
+                continue
+
+            frameid, _, mask = part.partition("/")
+            frameid = id_codec.parse_id(frameid)
+            extended = id_codec.is_extended(frameid)
+            if not 0 <= frameid <= id_codec.ID_MASK: raise ValueError(f"Frame id out of range: {part}")
+            mask = id_codec.parse_id(mask) if mask else id_codec.ID_MASK if extended else id_codec.MAX_STANDARD_ID
+            can_filters.append({"can_id": frameid, "can_mask": mask, "extended": extended})
+
+        if fields:
+            for can_id, can_mask in id_codec.get_filters(fields.get("type"), fields.get("mfg"), fields.get("api"), fields.get("num")):
+                can_filters.append({"can_id": can_id, "can_mask": can_mask, "extended": True})
+    return can_filters or None
+
+def match_can_filters(frameids: np.ndarray, can_filters: list, flags: np.ndarray = None):
+    # Vectorized python-can filter semantics: bool mask of the frames any filter accepts
+    frameids = np.asarray(frameids, dtype=np.uint32)
+    extended = id_codec.is_extended_array(frameids) if flags is None else id_codec.is_extended_flags(flags)
+    keep = np.zeros(len(frameids), dtype=bool)
+    for f in can_filters:
+        match = (frameids & f["can_mask"]) == (f["can_id"] & f["can_mask"])
+        if "extended" in f: match &= extended == f["extended"]
+        keep |= match
+    return keep
 
 def get_device_type(device_type: int, format: str["int", "hex", "str"]):
     if format == "int": return device_type
@@ -131,13 +396,53 @@ def convert_data(input_val: int | list[int], system, output_type: str["List", "S
 def convert_frameid(input_val, output_type: str["Int", "Hex", "Hex String"]):
 
     # Convert input to integer frameid
-    if isinstance(input_val, int): frameid_int = input_val
-    elif isinstance(input_val, str) and input_val.startswith("0x"): frameid_int = int(input_val[2:], 16)
-    else: frameid_int = int(input_val)
+    frameid_int = id_codec.parse_id(input_val)
 
-    # Convert to desired output type
+    # Convert to desired output type (Hex: the whole 29-bit id, big endian)
     if output_type == "Int": return frameid_int
-    elif output_type == "Hex": return bytes([frameid_int & 0xFF])
+    elif output_type == "Hex": return frameid_int.to_bytes(4, "big")
     elif output_type == "Hex String":return format(frameid_int, "016X")
 
-    return None
\ No newline at end of file
+    return None
+
+def hex_to_bytes_array(hex_strs: np.ndarray, width: int):
+    #Fixed width ASCII hex (N,) -> (N, width // 2) uint8
+    nibbles = HEX_LUT[np.frombuffer(hex_strs.astype(f"S{width}").tobytes(), dtype=np.uint8).reshape(-1, width)]
+    return (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+
+def convert_frameid_array(column):
+
+    # Numeric columns need no parsing
+    if column.dtype.kind in "iu": return column.to_numpy(dtype=np.uint32)
+
+    ids = column.astype(str).str.strip()
+    if not ids.str.match(r"0[xX]").all(): return ids.astype("int64").to_numpy(dtype=np.uint32)
+
+    id_bytes = hex_to_bytes_array(ids.str.slice(2).str.zfill(8).to_numpy(), 8).astype(np.uint32)
+    return (id_bytes[:, 0] << 24) | (id_bytes[:, 1] << 16) | (id_bytes[:, 2] << 8) | id_bytes[:, 3]
+
+def convert_data_array(column):
+
+    # "0X|C0 F1 06" (Innomaker) or "C0 F1 06" -> (N, 8) uint8 payload, DLC
+    hex_strs = column.fillna("").astype(str).str.removeprefix("0X|").str.replace(" ", "", regex=False)
+    dlcs = (hex_strs.str.len().to_numpy() // 2).clip(0, 8).astype(np.uint8)
+    payloads = hex_to_bytes_array(hex_strs.str.slice(0, 16).str.ljust(16, "0").to_numpy(), 16)
+    return [payloads, dlcs]
+
+def convert_format_array(column):
+
+    # "Extend Frame" / "Standard Frame" -> flags
+    return np.where(column.astype(str).str.strip().to_numpy() == vars.extended_frame_format, id_codec.FLAG_EXTENDED, 0).astype(np.uint8)
+
+def convert_msgs_array(msgs: list):
+
+    # python-can Messages -> same columns as a log: ts [ns], frameid, (N, 8) payload, dlc, flags
+    start = time.perf_counter_ns()
+    n = len(msgs)
+    ts_ns = np.fromiter((round(msg.timestamp * 1e9) for msg in msgs), dtype=np.int64, count=n)
+    frameids = np.fromiter((msg.arbitration_id for msg in msgs), dtype=np.uint32, count=n)
+    dlcs = np.fromiter((min(msg.dlc, 8) for msg in msgs), dtype=np.uint8, count=n)
+    payloads = np.frombuffer(b"".join(bytes(msg.data[:8]).ljust(8, b"\0") for msg in msgs), dtype=np.uint8).reshape(n, 8)
+    flags = np.fromiter((msg.is_extended_id for msg in msgs), dtype=np.uint8, count=n) * np.uint8(id_codec.FLAG_EXTENDED)
+    PIPELINE_STATS.add("convert", time.perf_counter_ns() - start, n)
+    return [ts_ns, frameids, payloads, dlcs, flags]
@@ -1,7 +1,18 @@
 import os
+import re
+import sys
 import time
 import logging
-from datetime import datetime, timezone
+import builtins
+import importlib
+from datetime import datetime, date
+import bin.formats.vars as vars
+
+# Startup timing: everything is measured from the moment this module is first imported
+STARTUP_T0 = time.perf_counter()
+STARTUP_MARKS = {}
+IMPORT_TIMES = {}
+ORIGINAL_IMPORT = builtins.__import__
 
 def get_global_logger():
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -21,6 +32,12 @@ def get_global_logger():
     logger.info("Global logger initialized")
     return logger
 
+def get_output_dir(name: str):
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    path = os.path.join(base_dir, "output_files", name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
 def find_file_path(filename : str):
     if os.path.isabs(filename) and os.path.exists(filename):
         return filename
@@ -35,18 +52,166 @@ def get_time(output_type : str):
     epoch = time.time()
     if output_type == "epoch": return epoch
 
-def convert_time(input : str | int | float, output_type : str["epoch","epoch"]):
+# Timestamp formats, checked in order against the first stamp of a file
+TIME_FORMATS = {
+    "date_time": re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{1,2}:\d{2}:\d{2}(\.\d+)?"),  # "2025-11-06 12:31:33.266"
+    "time_of_day": re.compile(r"\d{1,2}:\d{2}:\d{2}(\.\d+)?"),                     # GUI CSV "12:31:33.266"
+    "elapsed": re.compile(r"\d+\.\d{1,3}\.\d{1,3}"),                                # Innomaker "s.ms.us" since adapter start
+    "seconds": re.compile(r"\d+(\.\d+)?"),                                          # "1762454733.266"
+}
+TIME_FIELDS = {"date_time": 7, "time_of_day": 4, "elapsed": 3, "seconds": 2}
+FILE_DATE = re.compile(r"(\d{4})[-_]?(\d{2})[-_]?(\d{2})")
+
+def detect_time_format(sample : str):
+    sample = str(sample).strip()
+    for fmt, pattern in TIME_FORMATS.items():
+        if pattern.fullmatch(sample): return fmt
+    raise ValueError(f"Unrecognized timestamp format: {sample!r}")
+
+def get_file_date(path : str):
+    #First valid YYYY-MM-DD / YYYY_MM_DD / YYYYMMDD in the file name, or None
+    for match in FILE_DATE.finditer(os.path.basename(path)):
+        try: return date(*(int(g) for g in match.groups()))
+        except ValueError: continue
+    return None
+
+def get_time_fields(column, n_fields : int):
+    """
+    Digit runs of every stamp as (N, n_fields) int64 values and digit counts, from the column's
+    bytes: a non-digit right after a digit ends a field, so padding and separators of any kind work.
+    """
+    import numpy as np
 
-    if type(input) == str:
-        if "." in input and ":" in input and len(input.split(":")) == 3:
-            #epoch = datetime.strptime(input, "%H:%M:%S.%f").replace(year=datetime.epochnow().year,tzinfo=timezone.utc)
-            epoch = datetime.strptime("2025-12-31 12:31:33.266","%Y-%m-%d %H:%M:%S.%f").replace(tzinfo=timezone.utc).timestamp()*1000
-        elif "." in input and len(input.split(".")) == 3:
-            epoch = float(input.split(".")[0]) + (float(input.split(".")[1]) / 1000) + (float(input.split(".")[2]) / 1_000_000)
-    elif type(input) == float:
-        epoch = input
+    raw = np.asarray(column.to_numpy(dtype=object) if hasattr(column, "to_numpy") else column, dtype="S")
+    n = len(raw)
+    values = np.zeros((n, n_fields), dtype=np.int64)
+    counts = np.zeros((n, n_fields), dtype=np.int64)
+    if not n or not raw.dtype.itemsize: return values, counts
+    chars = raw.view(np.uint8).reshape(n, raw.dtype.itemsize)
+    is_digit = (chars >= 48) & (chars <= 57)
+
+    if not (is_digit == is_digit[0]).all():
+        #Right aligned, the padding read as leading zeros: lines up stamps whose first field grows (Innomaker seconds)
+        width = chars.shape[1]
+        idx = np.arange(width) - (width - np.count_nonzero(chars, axis=1))[:, None]
+        aligned = np.where(idx >= 0, np.take_along_axis(chars, np.maximum(idx, 0), axis=1), 48).astype(np.uint8)
+        aligned_digit = (aligned >= 48) & (aligned <= 57)
+        if (aligned_digit == aligned_digit[0]).all(): chars, is_digit = aligned, aligned_digit
+
+    if (is_digit == is_digit[0]).all():
+        #Same layout on every row (fixed width stamps): each field is one column span
+        edges = np.flatnonzero(np.diff(np.r_[False, is_digit[0], False]))
+        for j, (a, b) in enumerate(zip(edges[0::2][:n_fields].tolist(), edges[1::2][:n_fields].tolist())):
+            values[:, j] = (chars[:, a:b] - 48).astype(np.int64) @ (10 ** np.arange(b - a - 1, -1, -1, dtype=np.int64))
+            counts[:, j] = b - a
+        return values, counts
+
+    #Variable width: each digit is weighted by 10 ** (digits after it in its field)
+    prev_digit = np.c_[np.zeros(n, dtype=bool), is_digit[:, :-1]]
+    next_digit = np.c_[is_digit[:, 1:], np.zeros(n, dtype=bool)]
+    field = np.cumsum(is_digit & ~prev_digit, axis=1) - 1
+    seen = np.cumsum(is_digit, axis=1)
+    field_end = np.minimum.accumulate(np.where(is_digit & ~next_digit, seen, chars.shape[1])[:, ::-1], axis=1)[:, ::-1]
+    terms = np.where(is_digit, (chars.astype(np.int64) - 48) * 10 ** np.clip(field_end - seen, 0, 18), 0)
+    for j in range(n_fields):
+        in_field = is_digit & (field == j)
+        values[:, j] = np.where(in_field, terms, 0).sum(axis=1)
+        counts[:, j] = in_field.sum(axis=1)
+    return values, counts
+
+def get_fraction_ns(values, counts):
+    #Fraction digits -> ns, whatever their count (up to 9)
+    import numpy as np
+    return values * 10 ** (9 - np.clip(counts, 0, 9))
+
+def convert_time(input : str | int | float, output_type : str["epoch","epoch"]):
+    #Single stamp, same formats as convert_time_array (time of day: seconds since midnight)
+    if isinstance(input, (int, float)): epoch = float(input)
+    else: epoch = convert_time_array([str(input).strip()], "epoch")[0]
 
     if output_type == "epoch": return epoch
 
+def convert_time_array(column, output_type : str["epoch","epoch_ns"], fmt : str = None):
+    """
+    Column of stamps -> int64 ns, vectorized. fmt is detected from the first stamp unless given.
+    Time of day is ns since midnight and date_time is wall clock as if it were UTC; Timestamp_Parser
+    anchors both to local time.
+    """
+    import numpy as np
+
+    if hasattr(column, "dtype") and column.dtype.kind in "iuf":
+        #Numeric column: seconds
+        epoch_ns = np.round(np.asarray(column, dtype=np.float64) * 1e9).astype(np.int64)
+    else:
+        if fmt is None: fmt = detect_time_format(column.iloc[0] if hasattr(column, "iloc") else column[0]) if len(column) else "seconds"
+        values, counts = get_time_fields(column, TIME_FIELDS[fmt])
+
+        if fmt == "elapsed":
+            epoch_ns = values[:, 0] * 1_000_000_000 + values[:, 1] * 1_000_000 + values[:, 2] * 1_000
+        elif fmt == "seconds":
+            epoch_ns = values[:, 0] * 1_000_000_000 + get_fraction_ns(values[:, 1], counts[:, 1])
+        else:
+            h, m, sec, frac = values[:, -4:].T
+            epoch_ns = ((h * 60 + m) * 60 + sec) * 1_000_000_000 + get_fraction_ns(frac, counts[:, -1])
+            if fmt == "date_time":
+                days = ((values[:, 0] - 1970).astype("datetime64[Y]").astype("datetime64[M]") + (values[:, 1] - 1)).astype("datetime64[D]")
+                epoch_ns += (days.astype(np.int64) + values[:, 2] - 1) * 86_400_000_000_000
+
+    if output_type == "epoch_ns": return epoch_ns
+    if output_type == "epoch": return epoch_ns / 1e9
+
+def profile_job(name : str, func, *args, profile : bool = None, **kwargs):
+    #Runs func(*args, **kwargs), under cProfile if profile (default vars.profile_jobs) is set.
+    #The .prof and a cumulative-time summary go to output_files/profiles
+    if not (vars.profile_jobs if profile is None else profile): return func(*args, **kwargs)
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        path = os.path.join(get_output_dir("profiles"), f"{name}_{datetime.now():%Y-%m-%d_%H-%M-%S}")
+        profiler.dump_stats(path + ".prof")
+        with open(path + ".txt", "w") as f:
+            pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(vars.profile_top_n)
+        logging.getLogger("CANApp").info(f"Profile of {name} saved to {path}.prof")
+
 def wait_1s(): time.sleep(1)
-def wait(t:float): time.sleep(t)
\ No newline at end of file
+def wait(t:float): time.sleep(t)
+
+def timed_import(module_name : str):
+    t = time.perf_counter()
+    module = importlib.import_module(module_name)
+    IMPORT_TIMES.setdefault(module_name, time.perf_counter() - t)
+    return module
+
+def start_import_timer():
+    # Records the first-import time of every top-level third-party package until stop_import_timer()
+    def import_timer(name, globals=None, locals=None, fromlist=(), level=0):
+        top = name.partition(".")[0]
+        if level or not top or top in sys.modules or top in IMPORT_TIMES or top in sys.stdlib_module_names:
+            return ORIGINAL_IMPORT(name, globals, locals, fromlist, level)
+        t = time.perf_counter()
+        module = ORIGINAL_IMPORT(name, globals, locals, fromlist, level)
+        IMPORT_TIMES.setdefault(top, time.perf_counter() - t)
+        return module
+    builtins.__import__ = import_timer
+
+def stop_import_timer(): builtins.__import__ = ORIGINAL_IMPORT
+
+def mark_startup(label : str):
+    # Only the first occurrence of a label counts
+    if label not in STARTUP_MARKS: STARTUP_MARKS[label] = time.perf_counter() - STARTUP_T0
+    return STARTUP_MARKS[label]
+
+def get_startup_report():
+    report = {"marks_s": {k: round(v, 3) for k, v in STARTUP_MARKS.items()},
+              "imports_s": {k: round(v, 3) for k, v in sorted(IMPORT_TIMES.items(), key=lambda kv: -kv[1])}}
+    return report
+
+def log_startup_report(logger, label : str):
+    elapsed = mark_startup(label)
+    logger.info(f"Startup: {label} after {elapsed:.3f}s {get_startup_report()}")
+    if elapsed > vars.startup_budget_s:
+        logger.warning(f"Startup: {label} took {elapsed:.3f}s, budget is {vars.startup_budget_s}s")
@@ -3,7 +3,7 @@ import sys
 from PyQt5.QtWidgets import QApplication
 
 from bin.classes.gui_classes import MainWindow
-from bin.funcs.global_functions import get_global_logger
+from bin.funcs.global_functions import get_global_logger, log_startup_report, stop_import_timer
 
 
 def run():
@@ -19,5 +19,7 @@ def run():
 
     logger.info("GUI started")
     window.show()
+    log_startup_report(logger, "window shown")
+    stop_import_timer()  # later imports are not startup cost
 
     sys.exit(app.exec_())
\ No newline at end of file
@@ -1,42 +1,184 @@
-import os
-import yaml
-from struct import unpack
+import numpy as np
+from struct import Struct, unpack
+from bin.lib.FRC_CAN_Lib.device_library import load_library
+from bin.lib.FRC_CAN_Lib import id_codec
 
 # ------------------------------------------------------------
 # Global registry: {(manufacturer, device_type): {api: message_def}}
 # ------------------------------------------------------------
 DECODER_REGISTRY = {}
 
+# ------------------------------------------------------------
+# Compiled registry: {(device name, api): Compiled_Message}
+# Keyed by name: TalonFX, TalonSRX and VictorSPX share (CTRE, MotorController) but not layouts
+# ------------------------------------------------------------
+COMPILED_DECODERS = {}
+
+# ------------------------------------------------------------
+# Compiled by type: {(manufacturer, device_type, api): Compiled_Message}, for decode_frame.
+# When devices share a key, the one defining the most messages wins (TalonFX for CTRE motor
+# controllers), ties going to library order; DECODER_REGISTRY holds the same winners.
+# ------------------------------------------------------------
+TYPE_DECODERS = {}
+
+# ------------------------------------------------------------
+# Device names: {name: (manufacturer, device_type)}
+# ------------------------------------------------------------
+DEVICE_KEYS = {}
+
+# ------------------------------------------------------------
+# Message periods: {name: {api: period_ms}}
+# ------------------------------------------------------------
+DEVICE_PERIODS = {}
+
+# struct codes by (length, signed)
+STRUCT_CODES = {(1, False): "B", (1, True): "b", (2, False): "H", (2, True): "h",
+                (4, False): "I", (4, True): "i", (8, False): "Q", (8, True): "q"}
+FLOAT_CODES = {4: "f", 8: "d"}
+
 # ------------------------------------------------------------
 # Load all YAML files under FRC_CAN_Lib recursively
 # ------------------------------------------------------------
+LOADED = False
+
 def load_all_decoders(base_path=None):
     """
-    Recursively loads all YAML decoder files under FRC_CAN_Lib.
+    Builds the decoder registries from the shared device library.
     """
-    global DECODER_REGISTRY
+    global LOADED
+
+    devices = [data for data in load_library(base_path) if "device" in data]
+    for data in sorted(devices, key=lambda data: -len(data.get("messages") or {})):
+        mfg = data["device"]["manufacturer"]
+        dtype = data["device"]["device_type"]
+        messages = data.get("messages", {})
 
-    if base_path is None:
-        base_path = os.path.join("bin", "lib", "FRC_CAN_Lib")
+        name = data["device"]["name"]
+        key = (mfg, dtype)
+        DEVICE_KEYS[name] = key
+        DEVICE_PERIODS.setdefault(name, {}).update({int(api): msg_def["period_ms"] for api, msg_def in messages.items()
+                                                    if msg_def.get("period_ms")})
+        if key not in DECODER_REGISTRY:
+            DECODER_REGISTRY[key] = {}
 
-    for root, dirs, files in os.walk(base_path):
-        for file in files:
-            if file.endswith(".yaml"):
-                full_path = os.path.join(root, file)
-                with open(full_path, "r") as f:
-                    data = yaml.safe_load(f)
+        # Merge API definitions, keeping the first (most complete device's) one of a shared API
+        for api, msg_def in messages.items():
+            compiled = COMPILED_DECODERS[(name, int(api))] = Compiled_Message(int(api), msg_def)
+            if int(api) in DECODER_REGISTRY[key]: continue
+            DECODER_REGISTRY[key][int(api)] = msg_def
+            TYPE_DECODERS[(mfg, dtype, int(api))] = compiled
 
-                mfg = data["device"]["manufacturer"]
-                dtype = data["device"]["device_type"]
-                messages = data.get("messages", {})
+    LOADED = True
 
-                key = (mfg, dtype)
-                if key not in DECODER_REGISTRY:
-                    DECODER_REGISTRY[key] = {}
 
-                # Merge API definitions
-                for api, msg_def in messages.items():
-                    DECODER_REGISTRY[key][int(api)] = msg_def
+def ensure_loaded():
+    # Registries are filled on first use, not on import
+    if not LOADED: load_all_decoders()
+
+
+# ------------------------------------------------------------
+# Helper: parse a YAML scale ("1/32767", 0.1, 1)
+# ------------------------------------------------------------
+def parse_scale(scale):
+    if isinstance(scale, str) and "/" in scale:
+        num, den = scale.split("/")
+        return float(num) / float(den)
+    return float(scale) if isinstance(scale, str) else scale
+
+
+# ------------------------------------------------------------
+# Compiled message: one struct.Struct per run of non-overlapping fields
+# ------------------------------------------------------------
+class Compiled_Message:
+    def __init__(self, api, msg_def):
+        """
+        Precomputes everything decode_frame needs for one message definition:
+        the struct layout, field names, scales and units.
+        """
+        self.api = api
+        self.name = msg_def.get("name", f"API_{api}")
+        self.period_ms = msg_def.get("period_ms", None)
+
+        fields = sorted(msg_def.get("fields", []), key=lambda f: f["start"])
+        self.names = tuple(f["name"] for f in fields)
+        self.scales = tuple(parse_scale(f.get("scale", 1)) for f in fields)
+        self.scaled = any(scale != 1 for scale in self.scales)
+        self.units = {f["name"]: f["unit"] for f in fields if f.get("unit")}
+        self.size = max((f["start"] + f["length"] for f in fields), default=0)
+        self.layout = tuple((f["start"], f["length"], f.get("type", "uint").startswith("int")) for f in fields)
+        dtype_fields = {"names": [], "formats": [], "offsets": [], "itemsize": max(self.size, 8)}
+
+        # Split into runs that a single Struct can unpack; odd lengths come back as bytes
+        self.runs, self.raw_fields = [], []
+        fmt, pos = "<", 0
+        for i, field in enumerate(fields):
+            start, length = field["start"], field["length"]
+            ftype = field.get("type", "uint")
+            if start < pos:
+                self.runs.append(Struct(fmt))
+                fmt, pos = "<" + "x" * start, start
+            fmt += "x" * (start - pos)
+            if ftype.startswith("float") and length in FLOAT_CODES: code = FLOAT_CODES[length]
+            elif (length, ftype.startswith("int")) in STRUCT_CODES: code = STRUCT_CODES[(length, ftype.startswith("int"))]
+            else:
+                code = f"{length}s"
+                self.raw_fields.append((i, ftype.startswith("int")))
+            fmt += code
+            pos = start + length
+
+            if not code.endswith("s"):
+                dtype_fields["names"].append(field["name"])
+                dtype_fields["formats"].append("<" + code)
+                dtype_fields["offsets"].append(start)
+        self.runs.append(Struct(fmt))
+
+        # Same layout as a NumPy record over one payload row, for whole-log decoding
+        self.dtype = np.dtype(dtype_fields)
+
+    def unpack(self, data_bytes):
+        data_bytes = bytes(data_bytes)
+        if len(data_bytes) < self.size: data_bytes = data_bytes.ljust(self.size, b"\0")
+
+        if len(self.runs) == 1: values = self.runs[0].unpack_from(data_bytes)
+        else: values = tuple(v for run in self.runs for v in run.unpack_from(data_bytes))
+
+        if self.raw_fields:
+            values = list(values)
+            for i, signed in self.raw_fields:
+                values[i] = int.from_bytes(values[i], byteorder="little", signed=signed)
+
+        if self.scaled:
+            values = tuple(v if scale == 1 else v * scale for v, scale in zip(values, self.scales))
+        return values
+
+    def decode(self, data_bytes):
+        return {
+            "message_name": self.name,
+            "fields": dict(zip(self.names, self.unpack(data_bytes))),
+            "units": self.units
+        }
+
+    def unpack_batch(self, payloads):
+        """
+        Decodes an (N, 8) uint8 payload matrix in one pass. Returns {field name: array of N values}.
+        """
+        payloads = np.ascontiguousarray(payloads, dtype=np.uint8)
+        if payloads.shape[1] < self.dtype.itemsize:
+            payloads = np.pad(payloads, ((0, 0), (0, self.dtype.itemsize - payloads.shape[1])))
+        records = np.frombuffer(payloads, dtype=self.dtype)
+
+        raw = dict(self.raw_fields)
+        signals = {}
+        for i, name in enumerate(self.names):
+            if i in raw:
+                start, length, signed = self.layout[i]
+                values = np.zeros(len(payloads), dtype=np.int64)
+                for k in range(length): values |= payloads[:, start + k].astype(np.int64) << (8 * k)
+                if signed: values -= (values >> (8 * length - 1) & 1) << (8 * length)
+            else:
+                values = records[name]
+            signals[name] = values * self.scales[i] if self.scales[i] != 1 else values
+        return signals
 
 
 # ------------------------------------------------------------
@@ -72,56 +214,86 @@ def decode_frame(manufacturer, device_type, api, data_bytes):
     device_type: string ("MotorController")
     api: integer (e.g., 287)
     data_bytes: bytes object of length 8
+
+    Field values are numbers; units are returned separately under "units".
+    Devices sharing a manufacturer and device type decode with the TYPE_DECODERS winner;
+    decode_device_frame picks the layout of the identified model.
     """
 
-    key = (manufacturer, device_type)
+    ensure_loaded()
+    compiled = TYPE_DECODERS.get((manufacturer, device_type, api))
+    if compiled: return compiled.decode(data_bytes)
 
-    if key not in DECODER_REGISTRY:
+    if (manufacturer, device_type) not in DECODER_REGISTRY:
         return {"error": "Unknown device type", "raw": list(data_bytes)}
 
-    device_messages = DECODER_REGISTRY[key]
+    return {"error": "Unknown API for this device", "raw": list(data_bytes)}
 
-    if api not in device_messages:
-        return {"error": "Unknown API for this device", "raw": list(data_bytes)}
 
-    msg_def = device_messages[api]
-    fields = msg_def.get("fields", [])
+def decode_device_frame(name, api, data_bytes):
+    """
+    Decodes a CAN frame with the message layout of one device model.
 
-    decoded = {
-        "message_name": msg_def.get("name", f"API_{api}"),
-        "fields": {}
-    }
+    name: device name from identify_device ("TalonFX")
+    """
 
-    for field in fields:
-        name = field["name"]
-        start = field["start"]
-        length = field["length"]
-        ftype = field.get("type", "uint")
-        scale = field.get("scale", 1)
-        unit = field.get("unit", None)
+    ensure_loaded()
+    compiled = COMPILED_DECODERS.get((name, api))
+    if compiled: return compiled.decode(data_bytes)
 
-        signed = ftype.startswith("int")
+    if name not in DEVICE_KEYS:
+        return {"error": "Unknown device type", "raw": list(data_bytes)}
 
-        value = extract_value(data_bytes, start, length, signed=signed)
+    return {"error": "Unknown API for this device", "raw": list(data_bytes)}
 
-        # Apply scaling
-        if isinstance(scale, str) and "/" in scale:
-            # e.g., "1/32767"
-            num, den = scale.split("/")
-            scale = float(num) / float(den)
 
-        value = value * scale
+def decode_frameid(name, frameid, data_bytes):
+    """
+    decode_device_frame with the API taken from the frame's arbitration id.
+    """
+    return decode_device_frame(name, id_codec.get_api(frameid), data_bytes)
 
-        # Store result
-        if unit:
-            decoded["fields"][name] = f"{value} {unit}"
-        else:
-            decoded["fields"][name] = value
 
-    return decoded
+def decode_batch(name, api, payloads):
+    """
+    Decodes every frame of one message of a device model at once.
 
+    payloads: (N, 8) uint8 array, one row per frame (e.g. all frames of one arbitration ID)
+    Returns {"message_name", "fields": {name: array}, "units"} with arrays aligned to the rows.
+    """
 
-# ------------------------------------------------------------
-# Initialize registry on import
-# ------------------------------------------------------------
-load_all_decoders()
\ No newline at end of file
+    ensure_loaded()
+    compiled = COMPILED_DECODERS.get((name, api))
+    if not compiled:
+        return {"error": "Unknown device type" if name not in DEVICE_KEYS else "Unknown API for this device"}
+
+    return {
+        "message_name": compiled.name,
+        "fields": compiled.unpack_batch(payloads),
+        "units": compiled.units
+    }
+
+
+def get_device_key(name):
+    """
+    (manufacturer, device_type) of a device name from identify_device, e.g. "TalonFX".
+    """
+    ensure_loaded()
+    return DEVICE_KEYS.get(name)
+
+
+def get_decoder(name, api):
+    """
+    Returns the Compiled_Message for a device model's message, or None. Hot paths should hold on to it
+    and call .unpack(data_bytes) directly.
+    """
+    ensure_loaded()
+    return COMPILED_DECODERS.get((name, api))
+
+
+def get_period_ms(name, api):
+    """
+    Expected period of a device's message from its YAML (by device name, e.g. "TalonFX"), or None.
+    """
+    ensure_loaded()
+    return DEVICE_PERIODS.get(name, {}).get(api)
@@ -1,53 +1,49 @@
-import os
-import yaml
+from bin.lib.FRC_CAN_Lib.device_library import load_library
 
 ALL_DEVICE_DEFINITIONS = []
+LOADED = False
+
+# {manufacturer: [(name, always_used, sometimes_used, never_used)]} with frozenset API sets
+DEVICE_INDEX = {}
 
 def load_all_device_definitions(base_path=None):
     """
-    Loads all YAML device definition files from the FRC_CAN_Lib folder.
+    Loads all device definitions from the shared FRC_CAN_Lib device library.
     """
-    global ALL_DEVICE_DEFINITIONS
+    global LOADED
 
-    if base_path is None:
-        base_path = os.path.join("bin", "lib", "FRC_CAN_Lib")
+    for data in load_library(base_path):
+        # Validate structure
+        if "device" not in data or "api_usage" not in data:
+            print(f"Warning: YAML missing required fields: {data['path']}")
+            continue
 
-    for root, dirs, files in os.walk(base_path):
-        for file in files:
-            if file.endswith(".yaml"):
-                full_path = os.path.join(root, file)
-                with open(full_path, "r") as f:
-                    data = yaml.safe_load(f)
+        ALL_DEVICE_DEFINITIONS.append(data)
 
-                # Validate structure
-                if "device" not in data or "api_usage" not in data:
-                    print(f"Warning: YAML missing required fields: {full_path}")
-                    continue
+        api_usage = data["api_usage"]
+        DEVICE_INDEX.setdefault(data["device"]["manufacturer"], []).append((
+            data["device"]["name"],
+            frozenset(api_usage.get("always_used") or []),
+            frozenset(api_usage.get("sometimes_used") or []),
+            frozenset(api_usage.get("never_used") or [])
+        ))
 
-                ALL_DEVICE_DEFINITIONS.append(data)
+    LOADED = True
 
 def identify_device(cntr):
 
+    if not LOADED: load_all_device_definitions()
+    apis = cntr.api_set
     candidates = []
 
-    for device_yaml in ALL_DEVICE_DEFINITIONS:
-        dev = device_yaml["device"]
-
-        if dev["manufacturer"] != cntr.get_mfg("str"): continue
-        #if dev["device_type"] != cntr.get_device_type("str"): continue
-
-        always_used = device_yaml["api_usage"].get("always_used", [])
-        sometimes_used = device_yaml["api_usage"].get("sometimes_used", [])
-        never_used = device_yaml["api_usage"].get("never_used", [])
+    # Only definitions from the controller's manufacturer are scored
+    for name, always_used, sometimes_used, never_used in DEVICE_INDEX.get(cntr.get_mfg("str"), []):
+        if not never_used.isdisjoint(apis): continue
+        if not always_used <= apis: continue
+        score = len(sometimes_used & apis)
 
-        if any(api in never_used for api in cntr.apis):continue
-        if not all(api in cntr.apis for api in always_used):continue
-        score = sum(api in cntr.apis for api in sometimes_used)
-
-        candidates.append((score, dev["name"]))
+        candidates.append((score, name))
 
     if not candidates: return "Unknown"
     candidates.sort(reverse=True)
-    return candidates[0][1]
-
-load_all_device_definitions()
\ No newline at end of file
+    return candidates[0][1]
\ No newline at end of file
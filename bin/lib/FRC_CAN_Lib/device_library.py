@@ -0,0 +1,98 @@
+import os
+import pickle
+import hashlib
+
+# ------------------------------------------------------------
+# Paths (relative to this file, not the working directory)
+# ------------------------------------------------------------
+LIB_PATH = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(LIB_PATH, "__pycache__", "device_library.pickle")
+CACHE_VERSION = 1
+
+# ------------------------------------------------------------
+# Loaded libraries: {base_path: [device_yaml, ...]}
+# ------------------------------------------------------------
+LIBRARIES = {}
+
+
+# ------------------------------------------------------------
+# Helper: list YAML files and build the cache key from their stats
+# ------------------------------------------------------------
+def find_yaml_files(base_path):
+    paths = []
+    for root, dirs, files in os.walk(base_path):
+        for file in files:
+            if file.endswith(".yaml"):
+                paths.append(os.path.join(root, file))
+    return sorted(paths)
+
+
+def get_library_key(paths):
+    """
+    Hash of every YAML file's path, size and mtime. Any edit, add or delete changes it.
+    """
+    digest = hashlib.sha1(str(CACHE_VERSION).encode())
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{path}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+# ------------------------------------------------------------
+# Cache read / write
+# ------------------------------------------------------------
+def read_cache(cache_path, key):
+    try:
+        with open(cache_path, "rb") as f:
+            cache = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    return cache["devices"] if cache.get("key") == key else None
+
+
+def write_cache(cache_path, key, devices):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "wb") as f:
+            pickle.dump({"key": key, "devices": devices}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # read-only install: just parse the YAML next time
+
+
+# ------------------------------------------------------------
+# Main loader
+# ------------------------------------------------------------
+def load_library(base_path=None):
+    """
+    Returns every device YAML under FRC_CAN_Lib as a list of dicts (each with its "path").
+
+    The parsed tree is pickled next to the library and reused until a YAML file changes,
+    and it is only loaded once per process.
+    """
+    base_path = os.path.abspath(base_path or LIB_PATH)
+    if base_path in LIBRARIES:
+        return LIBRARIES[base_path]
+
+    paths = find_yaml_files(base_path)
+    key = get_library_key(paths)
+    cache_path = CACHE_PATH if base_path == LIB_PATH else os.path.join(base_path, "__pycache__", "device_library.pickle")
+
+    devices = read_cache(cache_path, key)
+    if devices is None:
+        import yaml
+
+        devices = []
+        for path in paths:
+            with open(path, "r") as f:
+                data = yaml.safe_load(f)
+            data["path"] = os.path.relpath(path, base_path)
+            devices.append(data)
+        write_cache(cache_path, key, devices)
+
+    LIBRARIES[base_path] = devices
+    return devices
+
+
+def reload_library(base_path=None):
+    LIBRARIES.pop(os.path.abspath(base_path or LIB_PATH), None)
+    return load_library(base_path)
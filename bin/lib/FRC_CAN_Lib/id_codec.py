@@ -0,0 +1,145 @@
+import numpy as np
+from functools import lru_cache
+
+# ------------------------------------------------------------
+# FRC 29-bit arbitration ID
+#   bits 28-24 device type | 23-16 manufacturer | 15-10 API class | 9-6 API index | 5-0 device number
+# The API (class << 4 | index) is what the device YAMLs are keyed by.
+# ------------------------------------------------------------
+DEVICE_TYPE_SHIFT, DEVICE_TYPE_MASK = 24, 0x1F
+MFG_SHIFT, MFG_MASK = 16, 0xFF
+API_SHIFT, API_MASK = 6, 0x3FF
+API_CLASS_SHIFT, API_CLASS_MASK = 4, 0x3F  # within the API
+API_INDEX_MASK = 0xF
+NUMBER_MASK = 0x3F
+
+ID_MASK = 0x1FFFFFFF
+MAX_STANDARD_ID = 0x7FF
+GLOBAL_KEY_MASK = 0x1FFF003F  # frame id with the API bits cleared: device type | manufacturer | device number
+
+# Frame flags column (and capture record flags)
+FLAG_EXTENDED = 0x01
+
+# Hot IDs on a bus are a few hundred at most
+ID_CACHE_SIZE = 1024
+
+
+# ------------------------------------------------------------
+# Scalar path
+# ------------------------------------------------------------
+@lru_cache(maxsize=ID_CACHE_SIZE)
+def decode_id(frameid: int):
+    """
+    (device type, manufacturer, API, device number) of a frame id.
+    """
+    return ((frameid >> DEVICE_TYPE_SHIFT) & DEVICE_TYPE_MASK, (frameid >> MFG_SHIFT) & MFG_MASK,
+            (frameid >> API_SHIFT) & API_MASK, frameid & NUMBER_MASK)
+
+
+@lru_cache(maxsize=ID_CACHE_SIZE)
+def decode_fields(frameid: int):
+    """
+    (device type, manufacturer, API class, API index, device number) of a frame id.
+    """
+    api = (frameid >> API_SHIFT) & API_MASK
+    return ((frameid >> DEVICE_TYPE_SHIFT) & DEVICE_TYPE_MASK, (frameid >> MFG_SHIFT) & MFG_MASK,
+            api >> API_CLASS_SHIFT, api & API_INDEX_MASK, frameid & NUMBER_MASK)
+
+
+def encode_id(device_type: int, mfg: int, api: int, device_number: int):
+    """
+    Frame id of a device type, manufacturer, API and device number. Raises ValueError on out of range fields.
+    """
+    for name, value, mask in (("device type", device_type, DEVICE_TYPE_MASK), ("manufacturer", mfg, MFG_MASK),
+                              ("API", api, API_MASK), ("device number", device_number, NUMBER_MASK)):
+        if not 0 <= value <= mask: raise ValueError(f"FRC {name} out of range 0-{mask}: {value}")
+    return (device_type << DEVICE_TYPE_SHIFT) | (mfg << MFG_SHIFT) | (api << API_SHIFT) | device_number
+
+
+def encode_api(api_class: int, api_index: int):
+    if not 0 <= api_class <= API_CLASS_MASK: raise ValueError(f"FRC API class out of range 0-{API_CLASS_MASK}: {api_class}")
+    if not 0 <= api_index <= API_INDEX_MASK: raise ValueError(f"FRC API index out of range 0-{API_INDEX_MASK}: {api_index}")
+    return (api_class << API_CLASS_SHIFT) | api_index
+
+
+def split_api(api: int): return api >> API_CLASS_SHIFT, api & API_INDEX_MASK
+def get_api(frameid: int): return (frameid >> API_SHIFT) & API_MASK
+def get_global_key(frameid: int): return frameid & GLOBAL_KEY_MASK
+def get_global_id(global_key: int):
+    return [(global_key >> DEVICE_TYPE_SHIFT) & DEVICE_TYPE_MASK, (global_key >> MFG_SHIFT) & MFG_MASK, global_key & NUMBER_MASK]
+
+# Guess from the id width, for sources that don't record the frame format
+def is_extended(frameid: int): return frameid > MAX_STANDARD_ID
+
+
+@lru_cache(maxsize=ID_CACHE_SIZE)
+def parse_str(text: str): return int(text, 16) if text[:2] in ("0x", "0X") else int(text)
+
+def parse_id(frameid: int | str):
+    """
+    Frame id from an int, "0x..." hex or decimal string.
+    """
+    if isinstance(frameid, str): return parse_str(frameid.strip())
+    return int(frameid)
+
+
+# ------------------------------------------------------------
+# Acceptance filters: (id, mask) pairs, a frame passes if frameid & mask == id & mask
+# ------------------------------------------------------------
+def get_range_masks(first: int, last: int, width: int):
+    """
+    [(value, mask)] of the fewest aligned blocks covering first..last within a width-bit field.
+    """
+    full = (1 << width) - 1
+    blocks = []
+    while first <= last:
+        size = first & -first if first else 1 << width
+        while size > last - first + 1: size >>= 1
+        blocks.append((first, full & ~(size - 1)))
+        first += size
+    return blocks
+
+
+def get_filters(device_type: int = None, mfg: int = None, api: int = None, device_numbers: tuple = None):
+    """
+    [(id, mask)] accepting the frames whose fields match. None matches anything;
+    device_numbers is an inclusive (first, last) range.
+    """
+    can_id = mask = 0
+    for value, field_mask, shift in ((device_type, DEVICE_TYPE_MASK, DEVICE_TYPE_SHIFT), (mfg, MFG_MASK, MFG_SHIFT),
+                                     (api, API_MASK, API_SHIFT)):
+        if value is None: continue
+        if not 0 <= value <= field_mask: raise ValueError(f"FRC field out of range 0-{field_mask}: {value}")
+        can_id |= value << shift
+        mask |= field_mask << shift
+
+    if device_numbers is None: return [(can_id, mask)]
+    first, last = device_numbers
+    if not 0 <= first <= last <= NUMBER_MASK: raise ValueError(f"FRC device number range must be within 0-{NUMBER_MASK}: {first}-{last}")
+    return [(can_id | value, mask | number_mask) for value, number_mask in get_range_masks(first, last, 6)]
+
+
+# ------------------------------------------------------------
+# Array path
+# ------------------------------------------------------------
+def decode_array(frameids):
+    """
+    [device types, manufacturers, APIs, device numbers] of an array of frame ids, as uint32 arrays.
+    """
+    frameids = np.asarray(frameids, dtype=np.uint32)
+    return [(frameids >> DEVICE_TYPE_SHIFT) & DEVICE_TYPE_MASK, (frameids >> MFG_SHIFT) & MFG_MASK,
+            (frameids >> API_SHIFT) & API_MASK, frameids & NUMBER_MASK]
+
+
+def encode_array(device_types, mfgs, apis, device_numbers):
+    # Fields are masked, not range checked
+    columns = [np.asarray(col, dtype=np.uint32) for col in (device_types, mfgs, apis, device_numbers)]
+    return (((columns[0] & DEVICE_TYPE_MASK) << DEVICE_TYPE_SHIFT) | ((columns[1] & MFG_MASK) << MFG_SHIFT)
+            | ((columns[2] & API_MASK) << API_SHIFT) | (columns[3] & NUMBER_MASK))
+
+
+def get_api_array(frameids): return (np.asarray(frameids, dtype=np.uint32) >> API_SHIFT) & API_MASK
+def split_api_array(apis): return np.asarray(apis) >> API_CLASS_SHIFT, np.asarray(apis) & API_INDEX_MASK
+def is_extended_array(frameids): return np.asarray(frameids) > MAX_STANDARD_ID
+def get_flags_array(frameids): return np.where(is_extended_array(frameids), FLAG_EXTENDED, 0).astype(np.uint8)
+def is_extended_flags(flags): return (np.asarray(flags) & FLAG_EXTENDED) != 0
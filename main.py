@@ -1,10 +1,19 @@
 import bin.funcs.global_functions as gf
-import bin.funcs.gui_functions as gui_funcs
-import bin.funcs.can_functions as cf
-import bin.classes.can_classes as cc
-import time
 
+#Heavy modules (PyQt5, pandas, python-can, numpy) are only imported by the path that uses them
+
+#cf = gf.timed_import("bin.funcs.can_functions")
 #cf.replay_can_bus("7530_mini_mini","InnoMaker")
 #cf.get_can_table("3100_mini_mini","InnoMaker")
 #cf.get_can_table("2025-11-06","InnoMaker")
-gui_funcs.run()
\ No newline at end of file
+#cf.get_can_table("2025-11-06","InnoMaker", profile=True)
+#cf.convert_to_capture("2025-11-06","Innomaker")
+#cf.get_can_table("2025-11-06.frccan","FRC Capture")
+#cf.get_dir_inventory("bin/input_files")
+#cf.get_bus_load_report("2025-11-06","Innomaker")
+#bf = gf.timed_import("bin.funcs.bench_functions"); bf.run_benchmarks([10_000, 1_000_000])
+#Worker processes (batch post processing) re-import this file, only the main process starts the GUI
+if __name__ == "__main__":
+    gf.start_import_timer()
+    gui_funcs = gf.timed_import("bin.funcs.gui_functions")
+    gui_funcs.run()